@@ -1,8 +1,11 @@
+import time
 import streamlit as st
 from datetime import datetime, timedelta, timezone
-from collections import Counter
-from collectors import collect_news
-from data_manager import load_news, save_news, load_history, save_history, merge_news
+import breaker
+import rendering
+from data_manager import load_snapshot
+from scheduler import is_refreshing, load_progress, request_refresh
+from telemetry import latest_run
 
 # 日本標準時 (JST) の定義
 JST = timezone(timedelta(hours=9))
@@ -13,6 +16,9 @@ st.set_page_config(
     layout="wide",
 )
 
+# ライブ表示時、取得中に画面を再読み込みする間隔（秒）
+LIVE_POLL_SECONDS = 1.0
+
 EXPECTED_SOURCES = ["Toyota", "Honda", "Mazda", "Subaru", "Daihatsu", "Suzuki", "Mitsubishi Motors", "Nissan"]
 
 try:
@@ -40,59 +46,51 @@ if not st.session_state["authenticated"]:
                     st.error("Invalid ID or Password")
     st.stop()
 
-# セッション状態の初期化
-if "display_count" not in st.session_state:
-    st.session_state["display_count"] = 20
-
-st.markdown("""
-<style>
-    .news-card { background: #fff; border-radius: 12px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.05); border: 1px solid #eee; }
-    .news-source { font-size: 0.75rem; color: #666; font-weight: 700; background: #f0f0f0; padding: 2px 8px; border-radius: 4px; }
-    .news-date { font-size: 0.8rem; color: #999; float: right; }
-    .news-title { font-size: 1.15rem; font-weight: 700; margin: 10px 0; }
-    .news-title a { text-decoration: none; color: #333; }
-    .news-summary { font-size: 0.9rem; color: #555; line-height: 1.6; }
-    .read-more { font-size: 0.85rem; color: #e63946; font-weight: 600; text-decoration: none; }
-    .more-button-container { display: flex; justify-content: center; margin: 30px 0; }
-</style>
-""", unsafe_allow_html=True)
-
-# データの読み込み
-news_items = load_news()
-fetch_history = load_history()
+# セッション状態の初期化（ページ番号はURLの ?page= からも復元する）
+if "page" not in st.session_state:
+    try:
+        st.session_state["page"] = max(1, int(st.query_params.get("page", 1)))
+    except ValueError:
+        st.session_state["page"] = 1
 
-st.title("🚗 BestCar Auto News")
+st.markdown(f"<style>{rendering.CARD_CSS}</style>", unsafe_allow_html=True)
 
-# ニュース取得関数
-def refresh_news():
-    with st.spinner("最新ニュースを取得中..."):
-        try:
-            new_items = collect_news()
-            current_news = load_news()
-            merged = merge_news(current_news, new_items)
-            save_news(merged)
-            
-            # 更新履歴の保存（チェックした時刻として記録）
-            now_str = datetime.now(JST).strftime("%Y/%m/%d %H:%M:%S")
-            save_history(now_str)
-            return True
-        except Exception as e:
-            st.error(f"取得中にエラーが発生しました: {e}")
-            return False
+# データの読み込み（ファイル更新時のみ再読み込みされる共有スナップショット）
+snapshot = load_snapshot()
+news_items = snapshot["news"]
+fetch_history = snapshot["history"]
+search_index = snapshot["index"]
+
+st.title("🚗 BestCar Auto News")
 
 # 初回起動時などでデータがない場合はメッセージ表示（自動取得はしない）
 if not news_items:
     st.info("⏳ まだニュースがありません。左のサイドバーにある「🔄 最新ニュースに更新」ボタンを押してニュースを取得してください。")
 
-source_counts = Counter(item.get("source", "Unknown") for item in news_items)
+source_counts = snapshot["source_counts"]
 
 st.sidebar.header("📊 ニュース管理")
 
 # 更新ボタン
-if st.sidebar.button("🔄 最新ニュースに更新", use_container_width=True):
-    if refresh_news():
-        st.session_state["display_count"] = 20  # 更新時は表示件数をリセット
-        st.rerun()
+# 取得はバックグラウンドの収集プロセス（scheduler.py）が行い、画面は保存済みデータを読むだけ
+live_mode = st.sidebar.toggle("ライブ表示（取得中の記事を順次表示）", value=True, key="live_mode")
+refresh_clicked = st.sidebar.button("🔄 最新ニュースに更新", use_container_width=True)
+if refresh_clicked:
+    status = request_refresh()
+    st.session_state["page"] = 1  # 更新時は1ページ目に戻す
+refreshing = is_refreshing()
+# メーカーごとに保存されるので、取得済みのメーカーから順に表示に反映される
+progress = load_progress() if refreshing else {}
+pending_sources = set(progress.get("sources", [])) - set(progress.get("done", []))
+if refresh_clicked and status == "running":
+    st.sidebar.info("現在ニュースを取得中です。")
+elif refreshing and live_mode:
+    done_count = len(progress.get("done", []))
+    st.sidebar.info(f"🔄 取得中… {done_count} / {len(progress.get('sources', [])) or '-'} メーカー完了。届いた記事から順に表示しています。")
+elif refresh_clicked:
+    st.sidebar.success("更新をリクエストしました。バックグラウンドで取得しています。")
+elif refreshing:
+    st.sidebar.info("🔄 バックグラウンドで取得中です。完了後に再読み込みすると反映されます。")
 
 # 更新履歴の表示
 st.sidebar.markdown("---")
@@ -109,55 +107,81 @@ else:
 st.sidebar.markdown("---")
 st.sidebar.header("🔍 フィルタ設定")
 
-all_sources = sorted(set(item["source"] for item in news_items)) if news_items else EXPECTED_SOURCES
+all_sources = snapshot["sources"] if news_items else EXPECTED_SOURCES
 selected_sources = st.sidebar.multiselect("メーカー選択", options=all_sources, default=all_sources)
 search_query = st.sidebar.text_input("キーワード検索", placeholder="例: EV, SUV...")
+# 期間（未指定なら全期間、開始日だけならその日以降）
+date_range = st.sidebar.date_input("期間", value=(), format="YYYY/MM/DD", key="date_range",
+                                   help=("保存済み: {} 〜 {}".format(*snapshot["date_range"]) if snapshot["date_range"] else None))
+since = datetime.combine(date_range[0], datetime.min.time(), tzinfo=JST) if len(date_range) > 0 else None
+until = datetime.combine(date_range[1], datetime.max.time(), tzinfo=JST) if len(date_range) > 1 else None
+page_size = st.sidebar.selectbox("1ページの表示件数", rendering.PAGE_SIZES, key="page_size")
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("ソース別取得件数")
+last_run = latest_run()
+run_sources = last_run["sources"] if last_run else {}
+breaker_state = breaker.load_state()
 for source in EXPECTED_SOURCES:
     count = source_counts.get(source, 0)
-    label = "🟢" if count > 0 else "🔴"
-    st.sidebar.write(f"{label} {source}: {count}件")
-
-# フィルタリング
-filtered_items = []
-for item in news_items:
-    if item["source"] not in selected_sources:
-        continue
-    if search_query:
-        query = search_query.lower()
-        if query not in item["title"].lower() and query not in item.get("summary", "").lower():
-            continue
-    filtered_items.append(item)
-
-st.caption(f"表示中: {min(len(filtered_items), st.session_state['display_count'])} / フィルタ後件数: {len(filtered_items)} / 総保存件数: {len(news_items)}")
-
-# ニュースの表示（表示件数制限）
-displayed_items = filtered_items[:st.session_state["display_count"]]
-
-for item in displayed_items:
-    try:
-        date_str = item["date"].strftime("%Y/%m/%d")
-    except Exception:
-        date_str = str(item["date"])
-        
-    st.markdown(f"""
-    <div class="news-card">
-        <div><span class="news-source">{item['source']}</span><span class="news-date">{date_str}</span></div>
-        <div class="news-title"><a href="{item['url']}" target="_blank">{item['title']}</a></div>
-        <div class="news-summary">{item['summary']}</div>
-        <a href="{item['url']}" target="_blank" class="read-more">元記事を読む →</a>
-    </div>
-    """, unsafe_allow_html=True)
-
-# 「もっと読む」ボタン
-if len(filtered_items) > st.session_state["display_count"]:
-    st.markdown('<div class="more-button-container">', unsafe_allow_html=True)
-    if st.button("もっと読む", type="primary"):
-        st.session_state["display_count"] += 20
-        st.rerun()
-    st.markdown('</div>', unsafe_allow_html=True)
+    label = "⏳" if source in pending_sources else ("🟢" if count > 0 else "🔴")
+    stats = run_sources.get(source)
+    if stats and stats.get("duration_ms") is not None:
+        # 前回の取得にかかった時間と、エラーがあればその種類
+        st.sidebar.write(f"{label} {source}: {count}件 （{stats['duration_ms'] / 1000:.1f}秒）")
+        if stats.get("errors"):
+            st.sidebar.caption("　⚠️ " + ", ".join(f"{name} ×{n}" for name, n in stats["errors"].items()))
+        if stats.get("incomplete"):
+            st.sidebar.caption("　⏱ 時間切れ（残りは次回の取得で補完）")
+    else:
+        st.sidebar.write(f"{label} {source}: {count}件")
+    # 連続して失敗しているメーカーは一定時間取得を止め、保存済みの記事を表示する
+    breaker_entry = breaker_state.get(breaker.source_key(source))
+    if breaker.is_open(breaker_entry):
+        retry_at = datetime.fromtimestamp(breaker_entry.get("retry_at", 0), JST).strftime("%H:%M")
+        st.sidebar.caption(f"　🚫 取得を一時停止中（{breaker_entry['failures']}回連続で失敗・{retry_at}以降に再試行）")
+open_hosts = [key.split(":", 1)[1] for key, entry in breaker_state.items() if key.startswith("host:") and breaker.is_open(entry)]
+if open_hosts:
+    st.sidebar.caption("🚫 記事ページの取得を一時停止中: " + ", ".join(open_hosts))
+
+# フィルタリング（スペース区切りで複数キーワードのAND検索）
+filtered_items = search_index.search(search_query, sources=selected_sources, since=since, until=until)
+
+# フィルタを変えたら1ページ目に戻す
+filter_key = (tuple(selected_sources), search_query, tuple(date_range), page_size)
+if st.session_state.get("filter_key") != filter_key:
+    if "filter_key" in st.session_state:
+        st.session_state["page"] = 1
+    st.session_state["filter_key"] = filter_key
+
+# ニュースの表示：表示中のページの記事だけを1つのHTMLにまとめて送る
+pages = rendering.page_count(len(filtered_items), page_size)
+page, page_items, offset = rendering.page_slice(filtered_items, st.session_state["page"], page_size)
+st.session_state["page"] = page
+if page > 1:
+    st.query_params["page"] = str(page)
+elif "page" in st.query_params:
+    del st.query_params["page"]
+
+st.caption(f"表示中: {offset + 1 if page_items else 0}〜{offset + len(page_items)}件目 / フィルタ後件数: {len(filtered_items)} / 総保存件数: {len(news_items)}")
+
+if page_items:
+    st.markdown(rendering.render_cards(page_items), unsafe_allow_html=True)
+
+# ページ送り
+def _move_page(step):
+    st.session_state["page"] = min(max(st.session_state["page"] + step, 1), pages)
+
+if pages > 1:
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    col_prev.button("← 前へ", on_click=_move_page, args=(-1,), disabled=page <= 1, use_container_width=True)
+    col_page.number_input(f"ページ（全{pages}ページ）", min_value=1, max_value=pages, step=1, key="page")
+    col_next.button("次へ →", on_click=_move_page, args=(1,), disabled=page >= pages, use_container_width=True)
 
 st.markdown("---")
-st.markdown("© 2026 BestCar Auto News Project")
\ No newline at end of file
+st.markdown("© 2026 BestCar Auto News Project")
+
+# ライブ表示：取得が終わるまで保存済みデータを読み直して表示を更新する
+if refreshing and live_mode:
+    time.sleep(LIVE_POLL_SECONDS)
+    st.rerun()
\ No newline at end of file
@@ -0,0 +1,364 @@
+import asyncio
+import concurrent.futures
+import functools
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+import breaker
+import collectors
+import endpoint_cache
+import http_cache
+import http_client
+import summary_cache
+import summary_extractor
+import telemetry
+
+# asyncio counterpart of collectors.iter_collect_news (NEWS_COLLECT_ENGINE=async).
+# Feeds, fallbacks and article pages of all sources share one event loop; concurrency is
+# bounded by semaphores instead of thread counts. Parsing, caches, breakers, telemetry and
+# the item format are the ones collectors.py uses.
+MAX_CONCURRENCY = 64
+
+class Response:
+    # The parts of requests.Response that http_cache and the parsers use
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+class Fetcher:
+    def __init__(self, session):
+        self.session = session
+        self.slots = asyncio.Semaphore(MAX_CONCURRENCY)
+        self.host_slots = {}
+        self.tasks = set()
+
+    def spawn(self, coro):
+        # Tracked so that whatever is still running at the end of the run can be cancelled
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def host_slot(self, url):
+        host = urlparse(url).netloc
+        if host not in self.host_slots:
+            self.host_slots[host] = asyncio.Semaphore(collectors.DETAIL_PER_HOST)
+        return self.host_slots[host]
+
+    async def request(self, url, headers, timeout, read_body=True):
+        # Same politeness, retry and deadline rules as http_client.get.
+        # With read_body=False the caller reads the streamed body and must release the response.
+        bucket = http_client.bucket_for(url)
+        while True:
+            wait = bucket.reserve()
+            if not wait: break
+            await asyncio.sleep(wait)
+        request_url = http_client.URL_REWRITE(url) if http_client.URL_REWRITE is not None else url
+        attempt = 0
+        while True:
+            seconds, clamped = http_client.clamp_timeout(url, timeout)
+            start = time.perf_counter()
+            try:
+                resp = await self.session.get(request_url, headers=headers, timeout=aiohttp.ClientTimeout(sock_connect=seconds, sock_read=seconds))
+                delay = _retry_after(resp.headers.get("Retry-After")) if resp.status in http_client.RETRY_STATUSES else None
+                if (resp.status in http_client.RETRY_STATUSES and attempt < http_client.MAX_RETRIES and not telemetry.expired()
+                        and http_client.retry_wait_fits(delay)):
+                    resp.release()
+                    attempt += 1
+                    await asyncio.sleep(delay if delay is not None else _backoff(attempt))
+                    continue
+                if not read_body:
+                    telemetry.record_request(url, resp.status, time.perf_counter() - start, 0)
+                    return resp
+                try:
+                    content = await resp.read()
+                finally:
+                    resp.release()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt < http_client.MAX_RETRIES and not telemetry.expired():
+                    attempt += 1
+                    await asyncio.sleep(_backoff(attempt))
+                    continue
+                telemetry.record_request(url, None, time.perf_counter() - start, 0, e)
+                if clamped and telemetry.expired():
+                    telemetry.mark_incomplete()
+                raise
+            telemetry.record_request(url, resp.status, time.perf_counter() - start, len(content))
+            return Response(url, resp.status, resp.headers, content)
+
+def _backoff(attempt):
+    return http_client.BACKOFF_FACTOR * 2 ** (attempt - 1) + random.uniform(0, http_client.BACKOFF_JITTER)
+
+def _retry_after(value):
+    try:
+        return min(float(value), http_client.MAX_RETRY_AFTER_SECONDS) if value else None
+    except ValueError:
+        return None
+
+async def run_parser(fn, *args):
+    if collectors.PARSE_MODE != "process":
+        return fn(*args)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(collectors.get_parse_pool(), functools.partial(fn, *args))
+    except concurrent.futures.BrokenExecutor:
+        collectors.shutdown_parse_pool()
+        return fn(*args)
+
+async def _read_summary(resp):
+    content_type = resp.headers.get("Content-Type")
+    if collectors.PARSE_MODE == "process":
+        body = bytearray()
+        async for chunk in resp.content.iter_chunked(16384):
+            telemetry.count("bytes", len(chunk))
+            body += chunk
+            if len(body) >= summary_extractor.MAX_SUMMARY_BYTES: break
+        return await run_parser(summary_extractor.extract_summary, bytes(body), content_type)
+    # Streamed: the download stops as soon as the extractor has enough text
+    stream = summary_extractor.StreamExtractor(content_type)
+    async for chunk in resp.content.iter_chunked(16384):
+        telemetry.count("bytes", len(chunk))
+        if stream.feed(chunk): break
+    return stream.close()
+
+async def fetch_page_summary(fetcher, url):
+    if not url: return ""
+    cached = summary_cache.get(url)
+    if cached is not None: return cached
+    host = breaker.host_key(urlparse(url).netloc)
+    try:
+        async with fetcher.host_slot(url):
+            # Checked once a host slot is free, so queued pages see failures of the ones ahead
+            if not breaker.allow(host): return ""
+            telemetry.count("detail_fetches")
+            async with fetcher.slots:
+                resp = await fetcher.request(url, collectors.HEADERS, 8, read_body=False)
+                try:
+                    if resp.status == 429 or resp.status >= 500:
+                        breaker.record_failure(host)
+                        return ""
+                    breaker.record_success(host)
+                    if resp.status != 200: return ""
+                    text = await _read_summary(resp)
+                finally:
+                    resp.release()
+        summary = collectors.trim_summary(text, limit=200)
+        summary_cache.put(url, summary)
+        return summary
+    except Exception as e:
+        telemetry.record_error(e)
+        if isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError)) and not telemetry.expired():
+            breaker.record_failure(host)
+        return ""
+
+async def fill_summaries(fetcher, news_list):
+    pending = [(item, fetcher.spawn(fetch_page_summary(fetcher, item["url"]))) for item in news_list if len(item["summary"]) < collectors.MIN_SUMMARY_LENGTH]
+    if pending:
+        await asyncio.wait([task for _, task in pending], timeout=telemetry.remaining())
+    for item, task in pending:
+        done = task.done()
+        detail_summary = task.result() if done else ""
+        if not done: task.cancel()
+        if detail_summary:
+            item["summary"] = detail_summary
+        elif not done or telemetry.expired():
+            # Out of time: keep the listing summary and let the next run fetch the article
+            item["incomplete"] = True
+            telemetry.mark_incomplete()
+    for item in news_list:
+        item["summary"] = collectors.trim_summary(item["summary"], limit=200, cleaned=True)
+    return news_list
+
+async def fetch_listing(fetcher, url, parse, headers=collectors.HEADERS, timeout=10):
+    entry, request_headers = http_cache.prepare(url, headers)
+    with telemetry.phase("network"):
+        async with fetcher.slots:
+            resp = await fetcher.request(url, request_headers, timeout)
+    resp, cached = http_cache.resolve(url, entry, resp)
+    if resp is None:
+        telemetry.count("items_found", len(cached))
+        return [item for item in cached if collectors.is_within_period(item.get("date"))]
+    with telemetry.phase("parse"):
+        parsed = await run_parser(parse, resp.content)
+    telemetry.count("items_found", len(parsed))
+    parsed = collectors.drop_duplicates(parsed)
+    with telemetry.phase("detail"):
+        news_list = await fill_summaries(fetcher, [item for item in parsed if not item.get("known")])
+    news_list += collectors.resolve_known([item for item in parsed if item.get("known")])
+    if any(item.get("incomplete") for item in news_list):
+        http_cache.forget(url)
+    else:
+        http_cache.store(url, resp, news_list)
+    return news_list
+
+async def fetch_rss(fetcher, url, source_name):
+    try:
+        if not url: return []
+        parse = functools.partial(collectors.parse_rss, source_name=source_name, watermark=collectors.get_watermark(source_name))
+        return await fetch_listing(fetcher, url.rstrip("/"), parse, headers=collectors.RSS_HEADERS)
+    except Exception as e:
+        telemetry.record_error(e)
+        return []
+
+async def fetch_listing_page(fetcher, source_name):
+    try:
+        parse = functools.partial(collectors.LISTING_PARSERS[source_name], watermark=collectors.get_watermark(source_name))
+        return await fetch_listing(fetcher, collectors.LISTING_URLS[source_name], parse)
+    except Exception as e:
+        telemetry.record_error(e)
+        return []
+
+async def _fetch_sequential(endpoints):
+    for key, fetch in endpoints:
+        if telemetry.expired():
+            telemetry.mark_incomplete()
+            break
+        news = await fetch()
+        if news: return key, news
+    return None, []
+
+async def _fetch_hedged(fetcher, endpoints):
+    # Same schedule as collectors._fetch_hedged, but slower endpoints are really cancelled
+    pending = list(endpoints)
+    running = {}
+    next_start = 0
+    try:
+        while running or (pending and not telemetry.expired()):
+            hedging = bool(pending) and not telemetry.expired()
+            if hedging and (not running or time.monotonic() >= next_start):
+                key, fetch = pending.pop(0)
+                running[fetcher.spawn(fetch())] = key
+                next_start = time.monotonic() + collectors.HEDGE_DELAY_SECONDS
+            # Past the deadline nothing new starts and the running endpoints get the grace
+            # period to hand back the items they have
+            remaining = telemetry.remaining()
+            timeout = None if remaining is None else max(remaining, 0) + collectors.DEADLINE_GRACE_SECONDS
+            if hedging and pending:
+                hedge_in = max(0, next_start - time.monotonic())
+                timeout = hedge_in if timeout is None else min(timeout, hedge_in)
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done and not (hedging and pending):
+                break
+            for task in done:
+                key = running.pop(task)
+                news = task.result()
+                if news: return key, news
+        return None, []
+    finally:
+        if telemetry.expired():
+            telemetry.mark_incomplete()
+        for task in running:
+            task.cancel()
+
+async def fetch_rss_with_fallback(fetcher, urls, source_name):
+    endpoints = []
+    for key in collectors.endpoint_keys(urls, source_name):
+        if key == "html":
+            endpoints.append((key, functools.partial(fetch_listing_page, fetcher, source_name)))
+        else:
+            endpoints.append((key, functools.partial(fetch_rss, fetcher, key, source_name)))
+    if collectors.HEDGE_FEEDS and len(endpoints) > 1:
+        key, news = await _fetch_hedged(fetcher, endpoints)
+    else:
+        key, news = await _fetch_sequential(endpoints)
+    if news: endpoint_cache.remember(source_name, key)
+    return news
+
+async def _run_source(fetcher, stats, deadline, name, data, method):
+    with telemetry.source_scope(stats):
+        stats.deadline = min(deadline, time.monotonic() + collectors.SOURCE_BUDGET_SECONDS)
+        stats.started = time.perf_counter()
+        try:
+            if method == "rss_multi":
+                news = await fetch_rss_with_fallback(fetcher, data, name)
+            else:
+                news = await fetch_listing_page(fetcher, name)
+        finally:
+            stats.duration = time.perf_counter() - stats.started
+        stats.add("items_kept", len(news))
+        collectors.claim_items(news)
+        return news
+
+async def collect(sources=None, deadline=None, emit=None, persist=True):
+    # Calls emit((source, items)) as each source finishes
+    deadline = time.monotonic() + (collectors.COLLECT_DEADLINE_SECONDS if deadline is None else deadline)
+    run, stored_news, active, skipped = collectors.begin_run(sources)
+    try:
+        for name in skipped:
+            emit((name, collectors.sort_news(collectors.stored_items_for(stored_news, name))))
+        # Per-host pacing is the token bucket's job, as with the non-blocking urllib3 pool
+        connector = aiohttp.TCPConnector(limit=MAX_CONCURRENCY, limit_per_host=0)
+        async with aiohttp.ClientSession(connector=connector, headers={"Accept-Encoding": http_client.ACCEPT_ENCODING}) as session:
+            fetcher = Fetcher(session)
+            tasks = {fetcher.spawn(_run_source(fetcher, run.sources[name], deadline, name, data, method)): name for name, data, method in active}
+            pending = set(tasks)
+            while pending:
+                # Sources get a short grace period past the deadline to hand back what they have
+                timeout = deadline - time.monotonic() + collectors.DEADLINE_GRACE_SECONDS
+                if timeout <= 0: break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks[task]
+                    try:
+                        news = task.result()
+                    except Exception as e:
+                        run.sources[name].record_error(e)
+                        news = []
+                    collectors.record_health(name, run.sources[name], news)
+                    emit((name, collectors.sort_news(news)))
+            for task in pending:
+                run.sources[tasks[task]].incomplete = True
+                breaker.record_failure(breaker.source_key(tasks[task]))
+            # Unlike threads, stragglers (sources, losing hedges, article pages) are cancelled
+            leftovers = list(fetcher.tasks)
+            for task in leftovers:
+                task.cancel()
+            await asyncio.gather(*leftovers, return_exceptions=True)
+    finally:
+        collectors.finish_run(run, persist)
+
+_DONE = object()
+
+def iter_collect_news(sources=None, deadline=None, persist=True):
+    # Synchronous generator over collect(): the event loop runs in its own thread
+    if aiohttp is None:
+        raise RuntimeError("NEWS_COLLECT_ENGINE=async requires aiohttp (pip install aiohttp)")
+    batches = queue.Queue()
+
+    def run():
+        try:
+            asyncio.run(collect(sources, deadline, batches.put, persist))
+        except BaseException as e:
+            batches.put(e)
+        finally:
+            batches.put(_DONE)
+
+    threading.Thread(target=run, name="async-collect", daemon=True).start()
+    while True:
+        batch = batches.get()
+        if batch is _DONE:
+            return
+        if isinstance(batch, BaseException):
+            raise batch
+        yield batch
+
+def collect_news(sources=None, deadline=None):
+    all_news = []
+    for _, news in iter_collect_news(sources, deadline):
+        all_news.extend(news)
+    return collectors.sort_news(all_news)
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import collectors  # noqa: E402
+import http_client  # noqa: E402
+from replay_server import save_manifest  # noqa: E402
+
+# Records the live feed, listing and article responses one collect_news run touches, for offline replay.
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+def main():
+    parser = argparse.ArgumentParser(description="Record live responses as benchmark fixtures")
+    parser.add_argument("fixture_dir", help="output directory, e.g. benchmarks/fixtures/live")
+    parser.add_argument("--sources", nargs="*", choices=collectors.SOURCE_NAMES)
+    args = parser.parse_args()
+
+    fixture_dir = os.path.abspath(args.fixture_dir)
+    os.makedirs(os.path.join(fixture_dir, "bodies"), exist_ok=True)
+    urls = []
+    http_client.URL_REWRITE = lambda url: urls.append(url) or url
+
+    # Cold run in a scratch directory so no cache or watermark hides a request
+    workdir = tempfile.mkdtemp(prefix="bestcar-record-")
+    os.chdir(workdir)
+    collectors.collect_news(args.sources)
+    http_client.URL_REWRITE = None
+
+    manifest = {}
+    for index, url in enumerate(dict.fromkeys(urls)):
+        try:
+            resp = http_client.get(url, headers=collectors.HEADERS, timeout=15)
+        except Exception as e:
+            print(f"skip {url}: {e}")
+            continue
+        name = f"bodies/{index:04d}.bin"
+        with open(os.path.join(fixture_dir, name), "wb") as f:
+            f.write(resp.content)
+        headers = {key: resp.headers[key] for key in KEPT_HEADERS if key in resp.headers}
+        manifest[url] = {"status": resp.status_code, "headers": headers, "body": name}
+        print(f"{resp.status_code} {len(resp.content):>8} {url}")
+    save_manifest(fixture_dir, manifest)
+    print(f"Recorded {len(manifest)} responses to {fixture_dir}")
+
+if __name__ == "__main__":
+    main()
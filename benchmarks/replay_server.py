@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Local stand-in for the makers' sites. Fixtures are a manifest of recorded responses:
+#   <fixture_dir>/manifest.json  {"https://host/path": {"status": 200, "headers": {...}, "body": "bodies/0001.bin"}}
+
+def load_manifest(fixture_dir):
+    with open(os.path.join(fixture_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(fixture_dir, manifest):
+    with open(os.path.join(fixture_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+class ReplayServer:
+    def __init__(self, fixture_dir, latency=0.0, jitter=0.0, error_rate=0.0, hang_urls=(), hang_seconds=30.0, seed=0):
+        self.fixture_dir = fixture_dir
+        self.manifest = load_manifest(fixture_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.hang_urls = set(hang_urls)
+        self.hang_seconds = hang_seconds
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.bodies = {}
+        self.stats = defaultdict(lambda: {"requests": 0, "bytes": 0, "not_modified": 0, "errors": 0, "missing": 0})
+        self.httpd = None
+        self.thread = None
+
+    # URLs are mapped to http://127.0.0.1:<port>/<scheme>/<host>/<path>
+    def rewrite(self, url):
+        parts = urlsplit(url)
+        local = f"{self.base_url}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+        return local + (f"?{parts.query}" if parts.query else "")
+
+    def original_url(self, path):
+        scheme, _, rest = path.lstrip("/").partition("/")
+        return f"{scheme}://{rest}"
+
+    def lookup(self, url):
+        for candidate in (url, url.rstrip("/"), url + "/" if not url.endswith("/") else url):
+            if candidate in self.manifest:
+                return candidate, self.manifest[candidate]
+        return url, None
+
+    def body(self, entry):
+        name = entry.get("body")
+        if not name:
+            return b""
+        with self.lock:
+            if name not in self.bodies:
+                with open(os.path.join(self.fixture_dir, name), "rb") as f:
+                    self.bodies[name] = f.read()
+            return self.bodies[name]
+
+    def snapshot_stats(self):
+        with self.lock:
+            return {host: dict(values) for host, values in self.stats.items()}
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats.clear()
+
+    def _count(self, host, key, amount=1):
+        with self.lock:
+            self.stats[host][key] += amount
+
+    def _delay(self):
+        with self.lock:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            fail = self.error_rate and self.random.random() < self.error_rate
+        return delay, fail
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = server.original_url(self.path)
+                host = urlsplit(url).netloc
+                server._count(host, "requests")
+                key, entry = server.lookup(url)
+                if key in server.hang_urls:
+                    time.sleep(server.hang_seconds)
+                delay, fail = server._delay()
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    server._count(host, "errors")
+                    return self._send(503, {}, b"")
+                if entry is None:
+                    server._count(host, "missing")
+                    return self._send(404, {}, b"")
+                body = server.body(entry)
+                headers = dict(entry.get("headers") or {})
+                etag = headers.setdefault("ETag", '"%s"' % hashlib.sha1(body).hexdigest())
+                if self.headers.get("If-None-Match") == etag:
+                    server._count(host, "not_modified")
+                    return self._send(304, {"ETag": etag}, b"")
+                server._count(host, "bytes", len(body))
+                return self._send(entry.get("status", 200), headers, body)
+
+            def _send(self, status, headers, body):
+                self.send_response(status)
+                for name, value in headers.items():
+                    if name.lower() not in ("content-length", "transfer-encoding", "content-encoding", "connection"):
+                        self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Streaming clients hang up early once they have enough text
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="replay-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
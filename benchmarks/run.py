@@ -0,0 +1,348 @@
+import argparse
+import functools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import breaker  # noqa: E402
+import collectors  # noqa: E402
+import data_manager  # noqa: E402
+import date_parsing  # noqa: E402
+import endpoint_cache  # noqa: E402
+import http_cache  # noqa: E402
+import http_client  # noqa: E402
+import summary_cache  # noqa: E402
+import summary_extractor  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+from replay_server import ReplayServer  # noqa: E402
+
+JST = timezone(timedelta(hours=9))
+
+LISTING_PARSERS = [
+    (name, url, functools.partial(collectors.parse_rss, source_name=name))
+    for name, urls in collectors.RSS_SOURCES.items() for url in urls
+] + [
+    ("Honda", "https://www.honda.co.jp/news/", collectors.parse_honda_html),
+    ("Mazda", "https://newsroom.mazda.com/ja/", collectors.parse_mazda_html),
+    ("Subaru", "https://www.subaru.co.jp/news/", collectors.parse_subaru_html),
+    ("Daihatsu", "https://www.daihatsu.com/jp/rss.xml", collectors.parse_daihatsu),
+    ("Suzuki", "https://www.suzuki.co.jp/release/release.xml", collectors.parse_suzuki),
+    ("Mitsubishi Motors", "https://www.mitsubishi-motors.com/jp/newsroom/index.html", collectors.parse_mitsubishi),
+    ("Nissan", "https://global.nissannews.com/ja-JP/channels/news", collectors.parse_nissan),
+]
+
+CLEAN_TEXT_SAMPLES = [
+    "新型「ロードスター」を発表 〜 人馬一体の走りをさらに進化",
+    "<p>トヨタ、新型<b>クラウン</b>を発売（別ウィンドウで開く）</p>",
+    "Honda &amp; SONY の合弁会社が新型EVを公開",
+    "  改行や   空白が\n多い   タイトル  ",
+]
+
+DATE_SAMPLES = [
+    "Wed, 14 Jan 2026 10:00:00 +0900",
+    "2026-01-14T10:00:00+09:00",
+    "2026/01/14",
+    "2026/1/14",
+    "2026-01-14",
+]
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+def fresh_workdir():
+    # Stores and caches use relative paths, so each scenario gets its own directory
+    os.chdir(tempfile.mkdtemp(prefix="bestcar-bench-"))
+    http_cache.reset()
+    summary_cache.reset()
+    endpoint_cache.reset()
+    breaker.reset()
+    collectors.set_known_items([], {})
+
+def _totals(stats):
+    totals = {"requests": 0, "bytes": 0, "not_modified": 0, "errors": 0, "missing": 0}
+    for values in stats.values():
+        for key in totals:
+            totals[key] += values.get(key, 0)
+    return totals
+
+def _timed_collect(server, sources):
+    server.reset_stats()
+    start = time.perf_counter()
+    items = collectors.collect_news(sources)
+    wall_ms = round((time.perf_counter() - start) * 1000, 3)
+    return dict(wall_ms=wall_ms, items=len(items), **_totals(server.snapshot_stats()))
+
+def _median_runs(runs):
+    result = dict(runs[0])
+    result["wall_ms"] = round(statistics.median(run["wall_ms"] for run in runs), 3)
+    return result
+
+def bench_network(server, repeat):
+    results = {"sources": {}, "collect_news": {}}
+    for name in collectors.SOURCE_NAMES:
+        cold, warm = [], []
+        for _ in range(repeat):
+            fresh_workdir()
+            cold.append(_timed_collect(server, [name]))
+            warm.append(_timed_collect(server, [name]))
+        results["sources"][name] = {"cold": _median_runs(cold), "warm": _median_runs(warm)}
+    cold, warm = [], []
+    for _ in range(repeat):
+        fresh_workdir()
+        cold.append(_timed_collect(server, None))
+        warm.append(_timed_collect(server, None))
+    results["collect_news"] = {"cold": _median_runs(cold), "warm": _median_runs(warm)}
+    return results
+
+def check_deadline(budget):
+    # Hedged and sequential feed fallback must hand back the same items when a multi-feed
+    # source runs out of its budget; returns the sources where they differ
+    saved = collectors.HEDGE_FEEDS, collectors.SOURCE_BUDGET_SECONDS
+    collectors.SOURCE_BUDGET_SECONDS = budget
+    mismatches = []
+    try:
+        for name in collectors.RSS_SOURCES:
+            urls = {}
+            for hedged in (True, False):
+                fresh_workdir()
+                http_client.close()
+                collectors.HEDGE_FEEDS = hedged
+                urls[hedged] = {item["url"] for item in collectors.collect_news([name])}
+            same = urls[True] == urls[False]
+            print(f"check deadline {name:<10} hedged {len(urls[True]):>4}  sequential {len(urls[False]):>4}  {'ok' if same else 'MISMATCH'}")
+            if not same:
+                mismatches.append(name)
+    finally:
+        collectors.HEDGE_FEEDS, collectors.SOURCE_BUDGET_SECONDS = saved
+    return mismatches
+
+# Paragraph text outside header/nav/footer ahead of a <main> that starts after the first 16 KiB chunk
+SUMMARY_CASES = {
+    "cookie-banner-before-main": (
+        "<html><head><title>t</title></head><body>"
+        + "<div class='cookie'>" + "<p>当サイトではクッキーを使用しています。詳しくはプライバシーポリシーをご覧ください。</p>" * 8 + "</div>"
+        + "<div>" + " " * 20000 + "</div>"
+        + "<main><p>新型車を発表しました。本文の最初の段落で、発売日と価格について詳しくお知らせします。</p></main>"
+        + "</body></html>"
+    ).encode("utf-8"),
+}
+SUMMARY_CHUNK_SIZES = [16384, 512]
+
+def _reference_summary(body):
+    # The BeautifulSoup scan fetch_page_summary used before summary_extractor
+    soup = BeautifulSoup(body, "html.parser")
+    for tag in soup(["script", "style", "noscript", "header", "footer", "nav"]):
+        tag.decompose()
+    container = soup.select_one("main") or soup.select_one("article") or soup
+    texts, total = [], 0
+    for p in container.find_all("p"):
+        text = p.get_text(strip=True)
+        if len(text) > summary_extractor.MIN_PARAGRAPH_LENGTH:
+            texts.append(text)
+            total += len(text)
+        if total > summary_extractor.ENOUGH_TEXT_LENGTH: break
+    return " ".join(texts)
+
+def _streamed_summary(body, content_type, chunk_size):
+    # Paragraph text only: meta descriptions have no counterpart in the reference scan
+    stream = summary_extractor.StreamExtractor(content_type)
+    for start in range(0, len(body), chunk_size):
+        if stream.feed(body[start:start + chunk_size]):
+            break
+    stream.close()
+    return " ".join(stream.extractor.paragraphs[stream.extractor._scope()])
+
+def check_summaries(server):
+    # The streamed extractor must pick the same paragraphs as the BeautifulSoup scan, whatever
+    # the chunking (one chunk in process parse mode, 16 KiB reads when streaming)
+    pages = dict(SUMMARY_CASES)
+    for url, entry in server.manifest.items():
+        headers = {key.lower(): value for key, value in entry.get("headers", {}).items()}
+        if entry.get("status", 200) == 200 and "html" in headers.get("content-type", ""):
+            pages[url] = server.body(entry)
+    mismatches = []
+    for name, body in pages.items():
+        expected = _reference_summary(body)
+        results = [_streamed_summary(body, None, size) for size in [len(body) or 1] + SUMMARY_CHUNK_SIZES]
+        if any(result != expected for result in results):
+            print(f"check summary MISMATCH {name}")
+            mismatches.append(name)
+    print(f"check summaries: {len(pages) - len(mismatches)} / {len(pages)} pages match")
+    return mismatches
+
+def bench_parse(server, repeat):
+    results = {}
+    for name, url, parse in LISTING_PARSERS:
+        key, entry = server.lookup(url)
+        if entry is None or entry.get("status", 200) != 200:
+            continue
+        body = server.body(entry)
+        results[url] = {"source": name, "bytes": len(body), "parse_ms": median_ms(lambda: parse(body), repeat)}
+    return results
+
+def _news_items(count, seed=0):
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 15, tzinfo=JST)
+    return [{
+        "source": rng.choice(collectors.SOURCE_NAMES),
+        "title": f"ニュース {i} " + "".join(rng.choice("新型SUVEVハイブリッド発表") for _ in range(12)),
+        "url": f"https://example.com/news/{i}",
+        "date": base - timedelta(minutes=i),
+        "summary": "本文" * 60,
+    } for i in range(count)]
+
+def bench_micro(sizes, repeat):
+    results = {
+        "clean_text_ms_per_1000": median_ms(lambda: [collectors.clean_text(s) for s in CLEAN_TEXT_SAMPLES * 250], repeat),
+        "parse_datetime_safe_ms_per_1000": median_ms(lambda: [collectors.parse_datetime_safe(collectors.normalize_date_text(s)) for s in DATE_SAMPLES * 200], repeat),
+        "store": {},
+    }
+    # Repeated date strings should be served by date_parsing's memo
+    info = date_parsing.cache_info()
+    results["date_cache"] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+    saved = data_manager.STORAGE_BACKEND, data_manager.MAX_NEWS, data_manager.RETENTION_DAYS
+    data_manager.RETENTION_DAYS = 36500
+    try:
+        for backend in ("json", "sqlite"):
+            for size in sizes:
+                fresh_workdir()
+                data_manager.STORAGE_BACKEND = backend
+                data_manager.MAX_NEWS = max(size, saved[1])
+                old, new = _news_items(size), _news_items(200, seed=1)
+                for item in new:
+                    item["url"] += "?new"
+                data_manager.save_news(list(old))
+                results["store"][f"{backend}_{size}"] = {
+                    "merge_news_ms": median_ms(lambda: data_manager.merge_news(old, new), repeat),
+                    "save_news_ms": median_ms(lambda: data_manager.save_news(data_manager.merge_news(old, new)), repeat),
+                    "load_news_ms": median_ms(data_manager.load_news, repeat),
+                }
+    finally:
+        data_manager.STORAGE_BACKEND, data_manager.MAX_NEWS, data_manager.RETENTION_DAYS = saved
+    return results
+
+def _flatten(data, prefix=""):
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path + "."))
+        elif isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+def compare(results, baseline, threshold):
+    # Time metrics (…_ms) that got slower than the baseline by more than threshold (and 1 ms) are regressions
+    current, previous = _flatten(results), _flatten(baseline)
+    regressions = []
+    for key, value in sorted(current.items()):
+        base = previous.get(key)
+        if not key.endswith("_ms") or not base:
+            continue
+        if value > base * (1 + threshold) and value - base > 1:
+            regressions.append((key, base, value))
+    return regressions
+
+def print_report(results):
+    network = results.get("network")
+    if network:
+        print(f"{'source':<20}{'cold ms':>10}{'warm ms':>10}{'reqs':>7}{'304':>6}{'KB':>9}{'items':>7}")
+        rows = list(network["sources"].items()) + [("collect_news", network["collect_news"])]
+        for name, row in rows:
+            cold, warm = row["cold"], row["warm"]
+            print(f"{name:<20}{cold['wall_ms']:>10.1f}{warm['wall_ms']:>10.1f}{cold['requests']:>7}{warm['not_modified']:>6}{cold['bytes'] / 1024:>9.1f}{cold['items']:>7}")
+    for url, row in results.get("parse", {}).items():
+        print(f"parse {row['source']:<18}{row['parse_ms']:>9.2f} ms {row['bytes'] / 1024:>8.1f} KB  {url}")
+    micro = results.get("micro")
+    if micro:
+        print(f"clean_text          {micro['clean_text_ms_per_1000']:>9.2f} ms / 1000")
+        print(f"parse_datetime_safe {micro['parse_datetime_safe_ms_per_1000']:>9.2f} ms / 1000")
+        cache = micro["date_cache"]
+        print(f"date cache          {cache['hits']} hits / {cache['misses']} misses ({cache['size']} entries)")
+        for key, row in micro["store"].items():
+            print(f"store {key:<14} merge {row['merge_news_ms']:>9.2f} ms  save {row['save_news_ms']:>9.2f} ms  load {row['load_news_ms']:>9.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline collector benchmarks against a local replay server")
+    parser.add_argument("--fixtures", required=True, help="fixture directory (benchmarks/record.py or benchmarks/synthetic.py)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--hang", action="append", default=[], help="URL that stalls for --hang-seconds")
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[200, 10000, 100000])
+    parser.add_argument("--skip-network", action="store_true")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--no-rate-limit", action="store_true", help="disable the per-host token bucket")
+    parser.add_argument("--detail-per-host", type=int, help="concurrent article page fetches per host (collectors.DETAIL_PER_HOST)")
+    parser.add_argument("--parse-mode", choices=["thread", "process"], default=collectors.PARSE_MODE, help="where fetched bodies are parsed during network runs")
+    parser.add_argument("--engine", choices=["threads", "async"], default=collectors.COLLECT_ENGINE, help="collection engine for network runs")
+    parser.add_argument("--check-summaries", action="store_true", help="only check that streamed article summaries match the BeautifulSoup scan")
+    parser.add_argument("--check-deadline", type=float, metavar="SECONDS", help="only check that hedged and sequential feed fallback return the same items with this per-source budget")
+    parser.add_argument("--live-dates", action="store_true", help="keep FILTER_DAYS; by default recorded dates never age out")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="previous --output file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    fixtures = os.path.abspath(args.fixtures)
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    if not args.live_dates:
+        collectors.FILTER_DAYS = 36500
+    if args.no_rate_limit:
+        http_client.RATE_PER_HOST, http_client.BURST_PER_HOST = 1e9, 10 ** 9
+    collectors.PARSE_MODE = args.parse_mode
+    collectors.COLLECT_ENGINE = args.engine
+    if args.detail_per_host:
+        collectors.configure_detail_pool(per_host=args.detail_per_host)
+
+    server = ReplayServer(fixtures, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          hang_urls=args.hang, hang_seconds=args.hang_seconds, seed=args.seed)
+    results = {"config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}}
+    with server:
+        http_client.URL_REWRITE = server.rewrite
+        try:
+            if args.check_summaries:
+                sys.exit(1 if check_summaries(server) else 0)
+            if args.check_deadline is not None:
+                sys.exit(1 if check_deadline(args.check_deadline) else 0)
+            if not args.skip_network:
+                results["network"] = bench_network(server, args.repeat)
+            results["parse"] = bench_parse(server, max(args.repeat, 20))
+        finally:
+            http_client.URL_REWRITE = None
+            collectors.shutdown_parse_pool()
+    if not args.skip_micro:
+        results["micro"] = bench_micro(args.sizes, args.repeat)
+
+    print_report(results)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for key, base, value in regressions:
+            print(f"REGRESSION {key}: {base:.2f} -> {value:.2f} ms")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from replay_server import save_manifest  # noqa: E402
+
+# Deterministic stand-in fixtures shaped like the eight makers' feeds and listing pages,
+# for running the benchmarks where the live sites cannot be recorded.
+JST = timezone(timedelta(hours=9))
+BASE_DATE = datetime(2026, 1, 15, 10, 0, tzinfo=JST)
+WORDS = ["新型", "SUV", "EV", "ハイブリッド", "発表", "販売開始", "一部改良", "特別仕様車", "電動化", "軽自動車", "受注", "価格"]
+
+def _title(rng, maker, i):
+    return f"{maker} " + " ".join(rng.sample(WORDS, 4)) + f" {i}"
+
+def _rss(rng, maker, host, count):
+    items = []
+    for i in range(count):
+        dt = BASE_DATE - timedelta(hours=6 * i)
+        items.append(
+            f"<item><title>{_title(rng, maker, i)}</title><link>https://{host}/news/{i}/</link>"
+            f"<pubDate>{dt.strftime('%a, %d %b %Y %H:%M:%S +0900')}</pubDate><description></description></item>"
+        )
+    return f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>{maker}</title>{"".join(items)}</channel></rss>'
+
+def _article(rng, paragraphs):
+    body = "".join(f"<p>{'。'.join(rng.sample(WORDS, 6))}について詳しくお知らせします。本文{i}。</p>" for i in range(paragraphs))
+    nav = "".join(f'<li><a href="/x/{i}">メニュー{i}</a></li>' for i in range(200))
+    return (
+        '<!DOCTYPE html><html lang="ja"><head><meta charset="utf-8"><title>release</title>'
+        + "<script>" + "var a=1;" * 2000 + "</script></head><body>"
+        + f"<header><nav><ul>{nav}</ul></nav></header><main><article>{body}</article></main><footer>footer</footer></body></html>"
+    )
+
+def build(count, paragraphs, seed):
+    rng = random.Random(seed)
+    pages = {}
+    article_urls = []
+
+    def add(url, body, content_type):
+        pages[url] = (body.encode("utf-8"), content_type)
+
+    for maker, url, host in [
+        ("トヨタ", "https://global.toyota/export/jp/allnews_rss.xml", "global.toyota"),
+        ("ホンダ", "https://www.honda.co.jp/RSS/all.xml", "www.honda.co.jp"),
+        ("マツダ", "https://newsroom.mazda.com/ja/rss/news_release.xml", "newsroom.mazda.com"),
+        ("スバル", "https://www.subaru.co.jp/news/feed", "www.subaru.co.jp"),
+    ]:
+        add(url, _rss(rng, maker, host, count), "application/rss+xml; charset=utf-8")
+        article_urls += [f"https://{host}/news/{i}/" for i in range(count)]
+
+    dates = [BASE_DATE - timedelta(hours=6 * i) for i in range(count)]
+    add("https://www.daihatsu.com/jp/rss.xml",
+        '<?xml version="1.0" encoding="utf-8"?><rss><channel>' + "".join(
+            f"<item><title>{dt.strftime('%Y-%m-%d')} {_title(rng, 'ダイハツ', i)}</title><link>https://www.daihatsu.com/jp/news/{i}.html</link></item>"
+            for i, dt in enumerate(dates)) + "</channel></rss>", "application/xml; charset=utf-8")
+    article_urls += [f"https://www.daihatsu.com/jp/news/{i}.html" for i in range(count)]
+
+    add("https://www.suzuki.co.jp/release/release.xml",
+        '<?xml version="1.0" encoding="utf-8"?><root>' + "".join(
+            f"<item><ttl>{_title(rng, 'スズキ', i)}</ttl><link>/release/a/{i}/</link><date>{dt.strftime('%Y年%m月%d日')}</date></item>"
+            for i, dt in enumerate(dates)) + "</root>", "application/xml; charset=utf-8")
+    article_urls += [f"https://www.suzuki.co.jp/release/a/{i}/" for i in range(count)]
+
+    add("https://www.mitsubishi-motors.com/jp/newsroom/index.html",
+        "<html><body>" + "".join(
+            f'<div class="m_newsMedia__item"><a class="m_newsMedia__link" href="/jp/newsroom/news/{i}.html">'
+            f'<p class="m_newsMedia__text">{_title(rng, "三菱", i)}</p><time class="m_newsMedia__time" datetime="{dt.strftime("%Y.%m.%d")}">{dt.strftime("%Y.%m.%d")}</time></a></div>'
+            for i, dt in enumerate(dates)) + "</body></html>", "text/html; charset=utf-8")
+    article_urls += [f"https://www.mitsubishi-motors.com/jp/newsroom/news/{i}.html" for i in range(count)]
+
+    add("https://global.nissannews.com/ja-JP/channels/news",
+        "<html><body>" + "".join(
+            f'<div class="release-item"><div class="title"><a href="/ja-JP/releases/{i}">{_title(rng, "日産", i)}</a></div>'
+            f'<time class="pub-date" datetime="{dt.isoformat()}">{dt.strftime("%Y/%m/%d")}</time></div>'
+            for i, dt in enumerate(dates)) + "</body></html>", "text/html; charset=utf-8")
+    article_urls += [f"https://global.nissannews.com/ja-JP/releases/{i}" for i in range(count)]
+
+    for url in article_urls:
+        add(url, _article(rng, paragraphs), "text/html; charset=utf-8")
+    return pages
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic benchmark fixtures")
+    parser.add_argument("fixture_dir")
+    parser.add_argument("--items", type=int, default=10, help="items per source")
+    parser.add_argument("--paragraphs", type=int, default=40, help="paragraphs per article page")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.join(args.fixture_dir, "bodies"), exist_ok=True)
+    manifest = {}
+    for index, (url, (body, content_type)) in enumerate(sorted(build(args.items, args.paragraphs, args.seed).items())):
+        name = f"bodies/{index:04d}.bin"
+        with open(os.path.join(args.fixture_dir, name), "wb") as f:
+            f.write(body)
+        manifest[url] = {"status": 200, "headers": {"Content-Type": content_type}, "body": name}
+    save_manifest(args.fixture_dir, manifest)
+    print(f"Wrote {len(manifest)} responses to {args.fixture_dir}")
+
+if __name__ == "__main__":
+    main()
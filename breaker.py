@@ -0,0 +1,69 @@
+import time
+
+from data_manager import JsonStateFile, read_json_file
+
+# Circuit breakers keyed "source:<name>" (whole sources in collect_news) and "host:<netloc>"
+# (article pages). After FAILURE_THRESHOLD failures in a row the key is skipped until its
+# retry time; then a single probe is let through and the wait doubles on every failed probe.
+BREAKER_FILE = "breaker_state.json"
+FAILURE_THRESHOLD = 3
+BASE_BACKOFF_SECONDS = 60
+MAX_BACKOFF_SECONDS = 6 * 3600
+
+_state = JsonStateFile(BREAKER_FILE)
+
+def source_key(name):
+    return f"source:{name}"
+
+def host_key(host):
+    return f"host:{host}"
+
+def _backoff(trips):
+    return min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** max(trips - 1, 0))
+
+def is_open(entry):
+    return bool(entry) and entry.get("failures", 0) >= FAILURE_THRESHOLD
+
+def allow(key):
+    with _state.lock:
+        entry = _state.entries().get(key)
+        if not is_open(entry):
+            return True
+        now = time.time()
+        if now < entry.get("retry_at", 0):
+            return False
+        # Half-open: this caller is the probe; everyone else waits for its outcome
+        entry["retry_at"] = now + _backoff(entry.get("trips", 1))
+        entry["probing"] = True
+        _state.dirty = True
+        return True
+
+def record_success(key):
+    with _state.lock:
+        if _state.entries().pop(key, None) is not None:
+            _state.dirty = True
+
+def record_failure(key):
+    now = time.time()
+    with _state.lock:
+        entry = _state.entries().setdefault(key, {"failures": 0, "trips": 0})
+        was_open = is_open(entry)
+        entry["failures"] = entry.get("failures", 0) + 1
+        entry["last_failure"] = now
+        # The wait grows when the breaker opens and on each failed probe, not for
+        # requests that were already in flight when it opened
+        if entry.pop("probing", False) or (not was_open and is_open(entry)):
+            entry["trips"] = entry.get("trips", 0) + 1
+            entry["retry_at"] = now + _backoff(entry["trips"])
+        _state.dirty = True
+
+def load_state():
+    # Read-only view for the dashboard, straight from disk
+    state = read_json_file(BREAKER_FILE, {})
+    return state if isinstance(state, dict) else {}
+
+def reset():
+    _state.reset()
+
+def flush():
+    _state.flush()
@@ -0,0 +1,156 @@
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+import collectors
+import scheduler
+import telemetry
+from data_manager import serialize_datetime
+
+# Headless collection for cron and shell pipelines: items are written as NDJSON (one JSON
+# object per line) as each source finishes, and merged into the store like a dashboard refresh.
+# Exit codes: 0 every source answered, 1 some sources failed, ran out of time or were skipped,
+# 2 bad arguments (argparse), 3 every source failed, 4 another refresh was already running.
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_FAILED = 3
+EXIT_BUSY = 4
+
+# Sources whose status counts as answered; "empty" is a source with nothing new and no errors
+OK_STATUSES = ("ok", "empty")
+PHASES = ["network", "parse", "dates", "detail"]
+PROFILE_TOP = 40
+
+def write_items(out, items):
+    # False once the reader has gone away (e.g. `| head`); collection and saving carry on
+    try:
+        for item in items:
+            out.write(json.dumps(item, ensure_ascii=False, default=serialize_datetime) + "\n")
+        out.flush()
+        return True
+    except BrokenPipeError:
+        return False
+
+def exit_code(record):
+    statuses = [stats["status"] for stats in (record or {}).get("sources", {}).values()]
+    if not statuses:
+        return EXIT_FAILED
+    answered = sum(1 for status in statuses if status in OK_STATUSES)
+    if answered == len(statuses):
+        return EXIT_OK
+    return EXIT_PARTIAL if answered else EXIT_FAILED
+
+class Profiler:
+    # cProfile of the main thread and of every thread started while it runs (collection pools,
+    # the asyncio engine's loop thread). Process-pool parse workers are not covered.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.profiles = []
+
+    def _start_thread(self, frame, event, arg):
+        profile = cProfile.Profile()
+        try:
+            # Replaces this hook as the thread's profile function
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: the main thread's profile already sees every thread
+            sys.setprofile(None)
+            return
+        with self.lock:
+            self.profiles.append(profile)
+
+    def __enter__(self):
+        profile = cProfile.Profile()
+        self.profiles.append(profile)
+        threading.setprofile(self._start_thread)
+        profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiles[0].disable()
+        threading.setprofile(None)
+
+    def stats(self):
+        with self.lock:
+            profiles = list(self.profiles)
+        for profile in profiles[1:]:
+            profile.disable()
+        return pstats.Stats(*profiles, stream=io.StringIO())
+
+def render_profile(record, stats, wall, top=PROFILE_TOP):
+    lines = [
+        f"BestCar Auto News collection profile  {record.get('started_at', '') if record else ''}",
+        f"engine={collectors.COLLECT_ENGINE} parse_mode={collectors.PARSE_MODE} wall={wall * 1000:.1f}ms",
+        "",
+        "Per source (ms). network: listing requests, parse: listing parsing (dates: date handling inside it),",
+        "detail: waiting for article pages, requests: sum of all HTTP request times (overlapping)",
+        f"{'source':<20}{'status':<12}{'total':>9}" + "".join(f"{name:>9}" for name in PHASES) + f"{'requests':>10}{'count':>7}{'items':>7}",
+    ]
+    for name, source in (record or {}).get("sources", {}).items():
+        phases = source.get("phase_ms", {})
+        lines.append(
+            f"{name:<20}{source['status']:<12}{source.get('duration_ms') or 0:>9.1f}"
+            + "".join(f"{phases.get(phase, 0):>9.1f}" for phase in PHASES)
+            + f"{source.get('request_ms', 0):>10.1f}{source.get('requests', 0):>7}{source.get('items_kept', 0):>7}"
+        )
+    stats.stream = io.StringIO()
+    stats.sort_stats("cumulative").print_stats(top)
+    lines += ["", f"cProfile, top {top} functions by cumulative time (all threads)", stats.stream.getvalue()]
+    return "\n".join(lines)
+
+def run(args, out):
+    reader = {"open": True}
+    def emit(name, items):
+        if reader["open"] and not write_items(out, items):
+            reader["open"] = False
+            # Keeps the interpreter's final flush of the closed pipe from failing again
+            os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+        print(f"{name}: {len(items)} items", file=sys.stderr)
+    items = scheduler.run_once(args.sources, join=False, deadline=args.deadline, on_batch=emit, dry_run=args.dry_run)
+    if items is None:
+        print("Another refresh is already running.", file=sys.stderr)
+        return EXIT_BUSY, None
+    record = telemetry.finished_run()
+    return exit_code(record), record
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BestCar Auto News headless collector (NDJSON output)")
+    parser.add_argument("--sources", nargs="*", choices=collectors.SOURCE_NAMES, help="collect only these sources")
+    parser.add_argument("--output", "-o", default="-", help="NDJSON output file ('-' for stdout)")
+    parser.add_argument("--dry-run", action="store_true", help="collect and print without writing the store, caches, breaker state or run log")
+    parser.add_argument("--deadline", type=float, help="seconds for the whole run")
+    parser.add_argument("--engine", choices=["threads", "async"], default=collectors.COLLECT_ENGINE, help="collection engine")
+    parser.add_argument("--parse-mode", choices=["thread", "process"], default=collectors.PARSE_MODE, help="where fetched bodies are parsed")
+    parser.add_argument("--profile", metavar="FILE", help="write a cProfile and per-source/per-phase timing report to FILE (raw stats to FILE.pstats)")
+    parser.add_argument("--profile-top", type=int, default=PROFILE_TOP, help="functions listed in the profile report")
+    args = parser.parse_args(argv)
+    collectors.COLLECT_ENGINE = args.engine
+    collectors.PARSE_MODE = args.parse_mode
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        if not args.profile:
+            code, _ = run(args, out)
+            return code
+        start = time.perf_counter()
+        with Profiler() as profiler:
+            code, record = run(args, out)
+        wall = time.perf_counter() - start
+        stats = profiler.stats()
+        stats.dump_stats(args.profile + ".pstats")
+        with open(args.profile, "w", encoding="utf-8") as f:
+            f.write(render_profile(record, stats, wall, args.profile_top))
+        print(f"Profile written to {args.profile}", file=sys.stderr)
+        return code
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
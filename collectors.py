@@ -1,14 +1,38 @@
 import concurrent.futures
+import functools
+import html
+import multiprocessing
+import os
 import re
 import sys
+import threading
 import time
 from datetime import datetime, timedelta, timezone
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 
 import feedparser
 import requests
-from bs4 import BeautifulSoup
-from dateutil import parser as date_parser
+from bs4 import BeautifulSoup, SoupStrainer
+
+import breaker
+import date_parsing
+import dedup
+import endpoint_cache
+import http_cache
+import http_client
+import summary_cache
+import summary_extractor
+import telemetry
+from data_manager import load_news, load_watermarks
+
+# Parser backend for HTML listings and markup in titles/summaries: "lxml" (default) or
+# "html.parser", which is also used when lxml is not installed
+HTML_PARSER = os.environ.get("NEWS_HTML_PARSER", "lxml")
+if HTML_PARSER == "lxml":
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        HTML_PARSER = "html.parser"
 
 # User-Agent for requests
 HEADERS = {
@@ -19,7 +43,34 @@ HEADERS = {
     )
 }
 
+RSS_HEADERS = dict(HEADERS, **{
+    "Accept": "application/rss+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "ja,en-US;q=0.7,en;q=0.3",
+    "Referer": "https://www.google.com/",
+})
+
 FILTER_DAYS = 14
+MIN_SUMMARY_LENGTH = 50
+
+# Overall refresh deadline and per-source budget (seconds); a source still running at the
+# deadline is returned as far as it got and marked incomplete
+COLLECT_DEADLINE_SECONDS = 45
+SOURCE_BUDGET_SECONDS = 30
+DEADLINE_GRACE_SECONDS = 2
+
+# "thread" parses fetched bodies in the fetching thread; "process" sends listing parsing,
+# feedparser and article-page extraction to a process pool sized to the cores, while the
+# network I/O stays in threads
+PARSE_MODE = os.environ.get("NEWS_PARSE_MODE", "thread")
+PARSE_WORKERS = os.cpu_count() or 1
+
+# "threads" (default) or "async": the asyncio engine in async_collectors.py drives all requests
+# of a run on one event loop (needs aiohttp)
+COLLECT_ENGINE = os.environ.get("NEWS_COLLECT_ENGINE", "threads")
+
+# Shared pool for article page fetches across all sources
+DETAIL_MAX_WORKERS = 16
+DETAIL_PER_HOST = 4
 
 RSS_SOURCES = {
     "Toyota": [
@@ -40,24 +91,31 @@ RSS_SOURCES = {
     ],
 }
 
+_window_note_re = re.compile(r"\s*（別ウィンドウで開く）\s*")
+
 def clean_text(text):
     if not text:
         return ""
     try:
-        text = re.sub(r"\s*（別ウィンドウで開く）\s*", "", str(text))
+        text = _window_note_re.sub("", str(text))
+        if "<" not in text:
+            # No markup: skip building a soup, only entities and whitespace need handling
+            if "&" in text: text = html.unescape(text)
+            return " ".join(text.split())
+        # Fragments stay on html.parser: lxml drops text around stray "<" and CDATA
         soup = BeautifulSoup(text, "html.parser")
         clean = soup.get_text(separator=" ", strip=True)
         return " ".join(clean.split())
     except Exception:
         return str(text)
 
-def trim_summary(text, limit=200):
-    cleaned = clean_text(text)
-    if len(cleaned) <= limit:
-        return cleaned
-    return cleaned[:limit].rstrip() + "..."
+def trim_summary(text, limit=200, cleaned=False):
+    if not cleaned: text = clean_text(text)
+    if len(text) <= limit:
+        return text
+    return text[:limit].rstrip() + "..."
 
-def parse_datetime_safe(value):
+def parse_datetime_safe(value, source=None):
     if value is None:
         return None
     if isinstance(value, datetime):
@@ -67,20 +125,25 @@ def parse_datetime_safe(value):
             return datetime(*value[:6], tzinfo=timezone.utc)
         except Exception:
             return None
+    start = time.perf_counter()
     try:
-        return date_parser.parse(str(value))
+        return date_parsing.parse_date(value, source)
     except Exception:
         return None
+    finally:
+        telemetry.add_phase("dates", time.perf_counter() - start)
+
+_date_table = str.maketrans({"年": "/", "月": "/", "日": None, ".": "/"})
 
 def normalize_date_text(text):
-    return str(text).replace("年", "/").replace("月", "/").replace("日", "").replace(".", "/")
+    return str(text).translate(_date_table)
 
-def extract_entry_datetime(entry):
+def extract_entry_datetime(entry, source=None):
     for key in ["published", "updated", "created", "issued", "date", "dc_date"]:
-        dt = parse_datetime_safe(getattr(entry, key, None))
+        dt = parse_datetime_safe(getattr(entry, key, None), source)
         if dt: return dt
     for key in ["published_parsed", "updated_parsed", "created_parsed"]:
-        dt = parse_datetime_safe(getattr(entry, key, None))
+        dt = parse_datetime_safe(getattr(entry, key, None), source)
         if dt: return dt
     return None
 
@@ -96,298 +159,758 @@ def is_within_period(dt):
 
 def fetch_page_summary(url):
     if not url: return ""
+    cached = summary_cache.get(url)
+    if cached is not None: return cached
+    host = breaker.host_key(urlparse(url).netloc)
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=8)
-        if resp.status_code != 200: return ""
-        resp.encoding = resp.apparent_encoding
-        soup = BeautifulSoup(resp.content, "html.parser")
-        for tag in soup(["script", "style", "noscript", "header", "footer", "nav"]):
-            tag.decompose()
-        container = soup.select_one("main") or soup.select_one("article") or soup
-        text_content = []
-        total_len = 0
-        for p in container.find_all("p"):
-            t = p.get_text(strip=True)
-            if len(t) > 20:
-                text_content.append(t)
-                total_len += len(t)
-            if total_len > 300: break
-        return trim_summary(" ".join(text_content), limit=200)
-    except Exception:
+        # Streamed: the download stops as soon as the extractor has enough text
+        with http_client.get(url, headers=HEADERS, timeout=8, stream=True) as resp:
+            if resp.status_code == 429 or resp.status_code >= 500:
+                breaker.record_failure(host)
+                return ""
+            breaker.record_success(host)
+            if resp.status_code != 200: return ""
+            chunks = _counted(resp.iter_content(chunk_size=16384))
+            if PARSE_MODE == "process":
+                # The pool gets the whole (capped) body; reading stays in this thread
+                content = _read_capped(chunks, summary_extractor.MAX_SUMMARY_BYTES)
+                text = run_parser(summary_extractor.extract_summary, content, resp.headers.get("Content-Type"))
+            else:
+                text = summary_extractor.extract_stream(chunks, resp.headers.get("Content-Type"))
+        summary = trim_summary(text, limit=200)
+        summary_cache.put(url, summary)
+        return summary
+    except Exception as e:
+        telemetry.record_error(e)
+        # Running out of the run's own time budget says nothing about the host
+        if isinstance(e, requests.RequestException) and not isinstance(e, http_client.DeadlineExceeded) and not telemetry.expired():
+            breaker.record_failure(host)
         return ""
 
-def _parse_rss_with_headers(url):
-    url = url.rstrip("/")
-    headers = HEADERS.copy()
-    headers.update({
-        "Accept": "application/rss+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "ja,en-US;q=0.7,en;q=0.3",
-        "Referer": "https://www.google.com/",
-    })
-    resp = requests.get(url, headers=headers, timeout=10)
-    resp.raise_for_status()
-    return feedparser.parse(resp.content)
+def _counted(chunks):
+    for chunk in chunks:
+        telemetry.count("bytes", len(chunk))
+        yield chunk
+
+def _read_capped(chunks, max_bytes):
+    body = bytearray()
+    for chunk in chunks:
+        body += chunk
+        if len(body) >= max_bytes: break
+    return bytes(body)
+
+_parse_lock = threading.Lock()
+_parse_pool = None
+
+def _init_parse_worker(filter_days, html_parser):
+    # Workers start from a fresh import (spawn), so carry over settings changed at runtime
+    global FILTER_DAYS, HTML_PARSER
+    FILTER_DAYS = filter_days
+    HTML_PARSER = html_parser
+
+def get_parse_pool():
+    global _parse_pool
+    with _parse_lock:
+        if _parse_pool is None:
+            # Spawned, not forked: the pool starts while fetch threads (and the dashboard's) run,
+            # and a forked child can inherit locks those threads hold
+            _parse_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_parse_worker, initargs=(FILTER_DAYS, HTML_PARSER))
+        return _parse_pool
+
+def shutdown_parse_pool():
+    global _parse_pool
+    with _parse_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+def run_parser(fn, *args):
+    # fn and args must be picklable in "process" mode (module-level functions, functools.partial)
+    if PARSE_MODE != "process":
+        return fn(*args)
+    try:
+        return get_parse_pool().submit(fn, *args).result()
+    except concurrent.futures.BrokenExecutor:
+        # A crashed worker takes the pool down; start a new one next time and parse here now
+        shutdown_parse_pool()
+        return fn(*args)
+
+_detail_lock = threading.Lock()
+_detail_executor = None
+_host_slots = {}
+
+def configure_detail_pool(max_workers=None, per_host=None):
+    global DETAIL_MAX_WORKERS, DETAIL_PER_HOST, _detail_executor
+    with _detail_lock:
+        if max_workers: DETAIL_MAX_WORKERS = max_workers
+        if per_host: DETAIL_PER_HOST = per_host
+        if _detail_executor is not None:
+            _detail_executor.shutdown(wait=False)
+        _detail_executor = None
+        _host_slots.clear()
+
+def _get_detail_executor():
+    global _detail_executor
+    with _detail_lock:
+        if _detail_executor is None:
+            _detail_executor = concurrent.futures.ThreadPoolExecutor(max_workers=DETAIL_MAX_WORKERS, thread_name_prefix="detail")
+        return _detail_executor
+
+def _host_slot(url):
+    host = urlparse(url).netloc
+    with _detail_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(DETAIL_PER_HOST)
+        return _host_slots[host]
+
+def submit_page_summary(url):
+    # The per-host slot is taken by the submitting (source) thread, so pool workers never sit idle waiting on a host
+    cached = summary_cache.get(url)
+    if cached is None and url and not breaker.allow(breaker.host_key(urlparse(url).netloc)):
+        cached = ""
+    if cached is not None or not url:
+        future = concurrent.futures.Future()
+        future.set_result(cached or "")
+        return future
+    executor = _get_detail_executor()
+    slot = _host_slot(url)
+    slot.acquire()
+    telemetry.count("detail_fetches")
+    try:
+        future = executor.submit(telemetry.bind(fetch_page_summary), url)
+    except Exception:
+        slot.release()
+        raise
+    future.add_done_callback(lambda _: slot.release())
+    return future
+
+def fill_summaries(news_list):
+    # Items whose listing summary is too short get the article page text instead
+    pending = [(item, submit_page_summary(item["url"])) for item in news_list if len(item["summary"]) < MIN_SUMMARY_LENGTH]
+    if pending:
+        concurrent.futures.wait([future for _, future in pending], timeout=telemetry.remaining())
+    for item, future in pending:
+        try:
+            detail_summary = future.result(timeout=0) if future.done() else ""
+        except Exception:
+            detail_summary = ""
+        if detail_summary:
+            item["summary"] = detail_summary
+        elif not future.done() or telemetry.expired():
+            # Out of time: keep the listing summary and let the next run fetch the article
+            item["incomplete"] = True
+            telemetry.mark_incomplete()
+    for item in news_list:
+        item["summary"] = trim_summary(item["summary"], limit=200, cleaned=True)
+    return news_list
+
+# Listing pages (HTML, or XML feeds parsed without feedparser) per source
+LISTING_URLS = {
+    "Honda": "https://www.honda.co.jp/news/",
+    "Mazda": "https://newsroom.mazda.com/ja/",
+    "Subaru": "https://www.subaru.co.jp/news/",
+    "Daihatsu": "https://www.daihatsu.com/jp/rss.xml",
+    "Suzuki": "https://www.suzuki.co.jp/release/release.xml",
+    "Mitsubishi Motors": "https://www.mitsubishi-motors.com/jp/newsroom/index.html",
+    "Nissan": "https://global.nissannews.com/ja-JP/channels/news",
+}
+
+# Feed endpoints of one source are hedged: when the preferred one has not returned items
+# after HEDGE_DELAY_SECONDS, the next one is started as well and the first non-empty result wins
+HEDGE_FEEDS = True
+HEDGE_DELAY_SECONDS = 2.0
+
+KNOWN_STREAK_LIMIT = 3
+
+_watermarks = {}
+_stored_items = {}
+_duplicates = dedup.DuplicateIndex()
+
+def set_known_items(stored_news, watermarks):
+    # Per-run view of what the store already holds: high-water marks per source plus stored items by URL
+    global _watermarks, _stored_items, _duplicates
+    _watermarks = watermarks
+    _stored_items = {item.get("url"): item for item in stored_news if item.get("url")}
+    # Stored items older than the collection period plus the near-duplicate window can't collide
+    since = time.time() - FILTER_DAYS * 86400 - dedup.DATE_WINDOW_HOURS * 3600
+    _duplicates = dedup.DuplicateIndex(stored_news, since=since)
+
+def drop_duplicates(news_list):
+    # Runs before article pages are fetched, on entries that are a stored item or one collected
+    # earlier in this run under another URL (dedup.py): this source's stored copy stands in for
+    # the entry like a known URL, anything else is dropped. Repeats within the listing go too.
+    seen = dedup.DuplicateIndex()
+    kept = []
+    for item in news_list:
+        if item.get("known"):
+            kept.append(item)
+            continue
+        match = _duplicates.find(item)
+        if match is not None and match.get("url") != item.get("url"):
+            telemetry.count("items_duplicate")
+            if match.get("source") == item.get("source") and _stored_items.get(match.get("url")) is match:
+                kept.append({"url": match["url"], "known": True})
+            continue
+        if seen.find(item) is not None:
+            telemetry.count("items_duplicate")
+            continue
+        seen.add([item])
+        kept.append(item)
+    return kept
+
+def claim_items(news_list):
+    # Items of a finished source; sources and feeds read after it drop their copies
+    _duplicates.add(news_list)
+
+def get_watermark(source_name):
+    return _watermarks.get(source_name)
+
+def _aware(dt):
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone(timedelta(hours=9)))
+
+class KnownItems:
+    # Stops a newest-first listing once it runs into articles that are already stored:
+    # after KNOWN_STREAK_LIMIT known URLs in a row, or at the first entry older than the
+    # source's newest stored date once a known URL has been seen. Never stops while items
+    # left incomplete by an earlier run are still ahead.
+    def __init__(self, watermark=None):
+        watermark = watermark or {}
+        self.urls = watermark.get("urls") or set()
+        self.pending = set(watermark.get("pending") or ())
+        self.completing = False
+        self.newest = watermark.get("newest")
+        self.streak = 0
+        self.hit = False
+        self.stop = False
+
+    def skip(self, url):
+        if url and url in self.urls:
+            self.hit = True
+            self.streak += 1
+            self.stop = self.streak >= KNOWN_STREAK_LIMIT and not self.pending
+            return True
+        self.completing = url in self.pending
+        self.pending.discard(url)
+        self.streak = 0
+        return False
+
+    def passed(self, dt):
+        if self.completing or self.pending or not (self.hit and self.newest and dt): return False
+        try:
+            return _aware(dt) < _aware(self.newest)
+        except Exception:
+            return False
+
+    def marker(self, url):
+        # Placeholder resolved to the stored item by fetch_listing; no parsing or detail fetch is spent on it
+        return {"url": url, "known": True}
+
+def resolve_known(parsed):
+    news_list = []
+    for item in parsed:
+        stored = _stored_items.get(item["url"])
+        if stored is not None and is_within_period(stored.get("date")):
+            news_list.append(dict(stored))
+    return news_list
+
+def fetch_listing(url, parse, headers=HEADERS, timeout=10):
+    # Unchanged feeds/pages (304 or same body hash) reuse the items extracted last time
+    with telemetry.phase("network"):
+        resp, cached = http_cache.conditional_get(url, headers, timeout)
+    if resp is None:
+        telemetry.count("items_found", len(cached))
+        return [item for item in cached if is_within_period(item.get("date"))]
+    with telemetry.phase("parse"):
+        parsed = run_parser(parse, resp.content)
+    telemetry.count("items_found", len(parsed))
+    parsed = drop_duplicates(parsed)
+    with telemetry.phase("detail"):
+        news_list = fill_summaries([item for item in parsed if not item.get("known")])
+    news_list += resolve_known([item for item in parsed if item.get("known")])
+    if any(item.get("incomplete") for item in news_list):
+        http_cache.forget(url)
+    else:
+        http_cache.store(url, resp, news_list)
+    return news_list
+
+def parse_rss(content, source_name, watermark=None):
+    feed = feedparser.parse(content)
+    known = KnownItems(watermark)
+    news_list = []
+    for entry in feed.entries:
+        link = getattr(entry, "link", "")
+        if known.skip(link):
+            news_list.append(known.marker(link))
+            if known.stop: break
+            continue
+        dt = extract_entry_datetime(entry, source_name)
+        if known.passed(dt): break
+        if dt is None or not is_within_period(dt): continue
+        summary_raw = getattr(entry, "summary", "") or getattr(entry, "description", "")
+        news_list.append({
+            "source": source_name,
+            "title": clean_text(getattr(entry, "title", "No Title")),
+            "url": link,
+            "date": dt,
+            "summary": clean_text(summary_raw),
+        })
+    return news_list
 
 def fetch_rss(url, source_name):
     try:
         if not url: return []
-        feed = _parse_rss_with_headers(url)
-        news_list = []
-        for entry in feed.entries:
-            dt = extract_entry_datetime(entry)
-            if dt is None or not is_within_period(dt): continue
-            summary_raw = getattr(entry, "summary", "") or getattr(entry, "description", "")
-            summary = clean_text(summary_raw)
-            if len(summary) < 50:
-                detail_summary = fetch_page_summary(getattr(entry, "link", ""))
-                if detail_summary: summary = detail_summary
-            news_list.append({
-                "source": source_name,
-                "title": clean_text(getattr(entry, "title", "No Title")),
-                "url": getattr(entry, "link", ""),
-                "date": dt,
-                "summary": trim_summary(summary, limit=200),
-            })
-        return news_list
-    except Exception:
+        parse = functools.partial(parse_rss, source_name=source_name, watermark=get_watermark(source_name))
+        return fetch_listing(url.rstrip("/"), parse, headers=RSS_HEADERS)
+    except Exception as e:
+        telemetry.record_error(e)
         return []
 
+def endpoint_keys(urls, source_name):
+    # Configured feed URLs, then the listing scraper ("html"); the endpoint that last worked goes first
+    keys = [url for url in urls if url]
+    if source_name in HTML_FALLBACKS:
+        keys.append("html")
+    preferred = endpoint_cache.get(source_name)
+    keys.sort(key=lambda key: key != preferred)
+    return keys
+
+def source_endpoints(urls, source_name):
+    return [(key, HTML_FALLBACKS[source_name] if key == "html" else functools.partial(fetch_rss, key, source_name)) for key in endpoint_keys(urls, source_name)]
+
+def _fetch_sequential(endpoints):
+    for key, fetch in endpoints:
+        if telemetry.expired():
+            telemetry.mark_incomplete()
+            break
+        news = fetch()
+        if news: return key, news
+    return None, []
+
+def _fetch_hedged(endpoints):
+    # The next endpoint starts when the running ones have failed or HEDGE_DELAY_SECONDS have passed
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(endpoints), thread_name_prefix="hedge")
+    pending = list(endpoints)
+    running = {}
+    next_start = 0
+    try:
+        while running or (pending and not telemetry.expired()):
+            hedging = bool(pending) and not telemetry.expired()
+            if hedging and (not running or time.monotonic() >= next_start):
+                key, fetch = pending.pop(0)
+                running[executor.submit(telemetry.bind(fetch))] = key
+                next_start = time.monotonic() + HEDGE_DELAY_SECONDS
+            # Past the deadline nothing new starts and the running endpoints get the grace
+            # period to hand back the items they have
+            remaining = telemetry.remaining()
+            timeout = None if remaining is None else max(remaining, 0) + DEADLINE_GRACE_SECONDS
+            if hedging and pending:
+                hedge_in = max(0, next_start - time.monotonic())
+                timeout = hedge_in if timeout is None else min(timeout, hedge_in)
+            done, _ = concurrent.futures.wait(running, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+            if not done and not (hedging and pending):
+                break
+            for future in done:
+                key = running.pop(future)
+                news = future.result()
+                if news: return key, news
+        return None, []
+    finally:
+        if telemetry.expired():
+            telemetry.mark_incomplete()
+        # Slower endpoints are not waited for; whatever they still fetch is discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+
 def fetch_rss_with_fallback(urls, source_name):
-    for url in urls:
-        news = fetch_rss(url, source_name)
-        if news: return news
-    if source_name == "Subaru": return fetch_subaru_html()
-    if source_name == "Mitsubishi Motors": return fetch_mitsubishi()
-    if source_name == "Honda": return fetch_honda_html()
-    if source_name == "Mazda": return fetch_mazda_html()
-    return []
+    endpoints = source_endpoints(urls, source_name)
+    if HEDGE_FEEDS and len(endpoints) > 1:
+        key, news = _fetch_hedged(endpoints)
+    else:
+        key, news = _fetch_sequential(endpoints)
+    if news: endpoint_cache.remember(source_name, key)
+    return news
 
-def fetch_honda_html():
-    url = "https://www.honda.co.jp/news/"
+_honda_block_re = re.compile(r"layoutgroup|numeric|_title")
+
+def parse_honda_html(content, watermark=None):
     base_url = "https://www.honda.co.jp"
+    soup = BeautifulSoup(content, HTML_PARSER, parse_only=SoupStrainer(class_=_honda_block_re))
+    known = KnownItems(watermark)
+    news_list = []
+    # Find blocks that have both a title link and a date
+    for block in soup.find_all(True, class_=_honda_block_re):
+        link_node = block.select_one("a[href*='/topics/'], a[href*='/news/']")
+        date_node = block.select_one("._num")
+        if link_node and date_node:
+            title = link_node.get_text(strip=True)
+            if not title: continue
+            link = urljoin(base_url, link_node.get("href"))
+            if known.skip(link):
+                news_list.append(known.marker(link))
+                if known.stop: break
+                continue
+            dt = parse_datetime_safe(normalize_date_text(date_node.get_text(strip=True)), "Honda")
+            if known.passed(dt): break
+            if dt and is_within_period(dt):
+                news_list.append({
+                    "source": "Honda",
+                    "title": clean_text(title),
+                    "url": link,
+                    "date": dt,
+                    "summary": "",
+                })
+    return news_list
+
+def fetch_honda_html():
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        resp.raise_for_status()
-        resp.encoding = resp.apparent_encoding
-        soup = BeautifulSoup(resp.content, "html.parser")
-        news_list = []
-        # Find blocks that have both a title link and a date
-        for block in soup.find_all(True, class_=re.compile(r"layoutgroup|numeric|_title")):
-            link_node = block.select_one("a[href*='/topics/'], a[href*='/news/']")
-            date_node = block.select_one("._num")
-            if link_node and date_node:
-                title = link_node.get_text(strip=True)
-                if not title: continue
-                link = urljoin(base_url, link_node.get("href"))
-                dt = parse_datetime_safe(normalize_date_text(date_node.get_text(strip=True)))
-                if dt and is_within_period(dt):
-                    news_list.append({
-                        "source": "Honda",
-                        "title": clean_text(title),
-                        "url": link,
-                        "date": dt,
-                        "summary": trim_summary(fetch_page_summary(link), limit=200)
-                    })
-        return news_list
-    except Exception:
+        return fetch_listing(LISTING_URLS["Honda"], functools.partial(parse_honda_html, watermark=get_watermark("Honda")))
+    except Exception as e:
+        telemetry.record_error(e)
         return []
 
-def fetch_mazda_html():
-    url = "https://newsroom.mazda.com/ja/"
+def parse_mazda_html(content, watermark=None):
     base_url = "https://newsroom.mazda.com"
-    try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        resp.raise_for_status()
-        resp.encoding = resp.apparent_encoding
-        soup = BeautifulSoup(resp.content, "html.parser")
-        news_list = []
-        # Mazda's newsroom uses simple A tags with date text inside or nearby
-        for link_node in soup.select("a[href*='/publicity/release/']"):
-            text = link_node.get_text(strip=True)
-            # Match date pattern 202x.x.x
+    soup = BeautifulSoup(content, HTML_PARSER)
+    known = KnownItems(watermark)
+    news_list = []
+    # Mazda's newsroom uses simple A tags with date text inside or nearby
+    for link_node in soup.select("a[href*='/publicity/release/']"):
+        link = urljoin(base_url, link_node.get("href"))
+        if known.skip(link):
+            news_list.append(known.marker(link))
+            if known.stop: break
+            continue
+        text = link_node.get_text(strip=True)
+        # Match date pattern 202x.x.x
+        m = re.search(r"(202\d[./]\d{1,2}[./]\d{1,2})", text)
+        if not m:
+            # Try sibling or parent
+            text = link_node.parent.get_text(strip=True)
             m = re.search(r"(202\d[./]\d{1,2}[./]\d{1,2})", text)
-            if not m:
-                # Try sibling or parent
-                text = link_node.parent.get_text(strip=True)
-                m = re.search(r"(202\d[./]\d{1,2}[./]\d{1,2})", text)
-            
-            if m:
-                dt = parse_datetime_safe(normalize_date_text(m.group(1)))
-                if dt and is_within_period(dt):
-                    title = text.replace(m.group(1), "").strip()
-                    # Remove "ニュースリリース" etc.
-                    title = re.sub(r"^\s*ニュースリリース\s*", "", title)
-                    news_list.append({
-                        "source": "Mazda",
-                        "title": clean_text(title),
-                        "url": urljoin(base_url, link_node.get("href")),
-                        "date": dt,
-                        "summary": trim_summary(fetch_page_summary(urljoin(base_url, link_node.get("href"))), limit=200)
-                    })
-        return news_list
-    except Exception:
+
+        if m:
+            dt = parse_datetime_safe(normalize_date_text(m.group(1)), "Mazda")
+            if known.passed(dt): break
+            if dt and is_within_period(dt):
+                title = text.replace(m.group(1), "").strip()
+                # Remove "ニュースリリース" etc.
+                title = re.sub(r"^\s*ニュースリリース\s*", "", title)
+                news_list.append({
+                    "source": "Mazda",
+                    "title": clean_text(title),
+                    "url": link,
+                    "date": dt,
+                    "summary": "",
+                })
+    return news_list
+
+def fetch_mazda_html():
+    try:
+        return fetch_listing(LISTING_URLS["Mazda"], functools.partial(parse_mazda_html, watermark=get_watermark("Mazda")))
+    except Exception as e:
+        telemetry.record_error(e)
         return []
 
+def parse_daihatsu(content, watermark=None):
+    soup = BeautifulSoup(content, "xml", parse_only=SoupStrainer("item"))
+    known = KnownItems(watermark)
+    news_list = []
+    for item in soup.find_all("item"):
+        link = item.find("link").get_text(strip=True) if item.find("link") else ""
+        if known.skip(link):
+            news_list.append(known.marker(link))
+            if known.stop: break
+            continue
+        title = item.find("title").get_text(strip=True) if item.find("title") else ""
+        dt = None
+        date_match = re.match(r"(\d{4}-\d{2}-\d{2})\s*", title)
+        if date_match: dt = parse_datetime_safe(date_match.group(1), "Daihatsu")
+        if known.passed(dt): break
+        if dt is None or not is_within_period(dt): continue
+        clean_title = re.sub(r"^\d{4}-\d{2}-\d{2}\s*", "", title) or title
+        news_list.append({
+            "source": "Daihatsu",
+            "title": clean_text(clean_title),
+            "url": link,
+            "date": dt,
+            "summary": "",
+        })
+    return news_list
+
 def fetch_daihatsu():
-    url = "https://www.daihatsu.com/jp/rss.xml"
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        resp.raise_for_status()
-        resp.encoding = resp.apparent_encoding
-        soup = BeautifulSoup(resp.content, "xml")
-        news_list = []
-        for item in soup.find_all("item"):
-            title = item.find("title").get_text(strip=True) if item.find("title") else ""
-            link = item.find("link").get_text(strip=True) if item.find("link") else ""
-            dt = None
-            date_match = re.match(r"(\d{4}-\d{2}-\d{2})\s*", title)
-            if date_match: dt = parse_datetime_safe(date_match.group(1))
-            if dt is None or not is_within_period(dt): continue
-            clean_title = re.sub(r"^\d{4}-\d{2}-\d{2}\s*", "", title) or title
-            news_list.append({
-                "source": "Daihatsu",
-                "title": clean_text(clean_title),
-                "url": link,
-                "date": dt,
-                "summary": trim_summary(fetch_page_summary(link), limit=200),
-            })
-        return news_list
-    except Exception:
+        return fetch_listing(LISTING_URLS["Daihatsu"], functools.partial(parse_daihatsu, watermark=get_watermark("Daihatsu")))
+    except Exception as e:
+        telemetry.record_error(e)
         return []
 
+def parse_suzuki(content, watermark=None):
+    soup = BeautifulSoup(content, "xml", parse_only=SoupStrainer("item"))
+    known = KnownItems(watermark)
+    news_list = []
+    for item in soup.find_all("item"):
+        link_rel = item.find("link").get_text(strip=True) if item.find("link") else ""
+        full_url = urljoin("https://www.suzuki.co.jp", link_rel)
+        if known.skip(full_url):
+            news_list.append(known.marker(full_url))
+            if known.stop: break
+            continue
+        title = item.find("ttl").get_text(strip=True) if item.find("ttl") else "No Title"
+        date_str = item.find("date").get_text(strip=True) if item.find("date") else ""
+        dt = parse_datetime_safe(normalize_date_text(date_str), "Suzuki")
+        if dt: dt = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        if known.passed(dt): break
+        if dt is None or not is_within_period(dt): continue
+        news_list.append({
+            "source": "Suzuki",
+            "title": clean_text(title),
+            "url": full_url,
+            "date": dt,
+            "summary": "",
+        })
+    return news_list
+
 def fetch_suzuki():
-    url = "https://www.suzuki.co.jp/release/release.xml"
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        resp.raise_for_status()
-        resp.encoding = resp.apparent_encoding
-        soup = BeautifulSoup(resp.content, "xml")
-        news_list = []
-        for item in soup.find_all("item"):
-            title = item.find("ttl").get_text(strip=True) if item.find("ttl") else "No Title"
-            link_rel = item.find("link").get_text(strip=True) if item.find("link") else ""
-            date_str = item.find("date").get_text(strip=True) if item.find("date") else ""
-            dt = parse_datetime_safe(normalize_date_text(date_str))
-            if dt: dt = dt.replace(hour=0, minute=0, second=0, microsecond=0)
-            if dt is None or not is_within_period(dt): continue
-            full_url = urljoin("https://www.suzuki.co.jp", link_rel)
-            news_list.append({
-                "source": "Suzuki",
-                "title": clean_text(title),
-                "url": full_url,
-                "date": dt,
-                "summary": trim_summary(fetch_page_summary(full_url), limit=200),
-            })
-        return news_list
-    except Exception:
+        return fetch_listing(LISTING_URLS["Suzuki"], functools.partial(parse_suzuki, watermark=get_watermark("Suzuki")))
+    except Exception as e:
+        telemetry.record_error(e)
         return []
 
+def parse_mitsubishi(content, watermark=None):
+    soup = BeautifulSoup(content, HTML_PARSER, parse_only=SoupStrainer(class_="m_newsMedia__item"))
+    known = KnownItems(watermark)
+    news_list = []
+    for item in soup.select(".m_newsMedia__item"):
+        link_node = item.select_one("a.m_newsMedia__link")
+        if not link_node: continue
+        link = urljoin("https://www.mitsubishi-motors.com", link_node.get("href"))
+        if known.skip(link):
+            news_list.append(known.marker(link))
+            if known.stop: break
+            continue
+        title_node = item.select_one(".m_newsMedia__text")
+        title = title_node.get_text(strip=True) if title_node else "No Title"
+        date_node = item.select_one("time.m_newsMedia__time")
+        dt = parse_datetime_safe(normalize_date_text(date_node.get("datetime") or date_node.get_text(strip=True)), "Mitsubishi Motors") if date_node else None
+        if known.passed(dt): break
+        if dt is None or not is_within_period(dt): continue
+        news_list.append({
+            "source": "Mitsubishi Motors",
+            "title": clean_text(title),
+            "url": link,
+            "date": dt,
+            "summary": "",
+        })
+    return news_list
+
 def fetch_mitsubishi():
     try:
-        resp = requests.get("https://www.mitsubishi-motors.com/jp/newsroom/index.html", headers=HEADERS, timeout=10)
-        resp.raise_for_status()
-        resp.encoding = resp.apparent_encoding
-        soup = BeautifulSoup(resp.content, "html.parser")
-        news_list = []
-        for item in soup.select(".m_newsMedia__item"):
-            link_node = item.select_one("a.m_newsMedia__link")
-            if not link_node: continue
-            title_node = item.select_one(".m_newsMedia__text")
-            title = title_node.get_text(strip=True) if title_node else "No Title"
-            link = urljoin("https://www.mitsubishi-motors.com", link_node.get("href"))
-            date_node = item.select_one("time.m_newsMedia__time")
-            dt = parse_datetime_safe(normalize_date_text(date_node.get("datetime") or date_node.get_text(strip=True))) if date_node else None
-            if dt is None or not is_within_period(dt): continue
-            news_list.append({
-                "source": "Mitsubishi Motors",
-                "title": clean_text(title),
-                "url": link,
-                "date": dt,
-                "summary": trim_summary(fetch_page_summary(link), limit=200),
-            })
-        return news_list
-    except Exception:
+        return fetch_listing(LISTING_URLS["Mitsubishi Motors"], functools.partial(parse_mitsubishi, watermark=get_watermark("Mitsubishi Motors")))
+    except Exception as e:
+        telemetry.record_error(e)
         return []
 
+def parse_subaru_html(content, watermark=None):
+    soup = BeautifulSoup(content, HTML_PARSER)
+    known = KnownItems(watermark)
+    news_list = []
+    for item in soup.select(".section_news-list li, .news-list li, ul li"):
+        link_node = item.select_one("a")
+        if not link_node or not link_node.get("href"): continue
+        link = urljoin("https://www.subaru.co.jp", link_node.get("href"))
+        if known.skip(link):
+            news_list.append(known.marker(link))
+            if known.stop: break
+            continue
+        m = re.search(r"(\d{4}[/年]\d{1,2}[/月]\d{1,2})", item.get_text(" ", strip=True))
+        dt = parse_datetime_safe(normalize_date_text(m.group(1)), "Subaru") if m else None
+        if known.passed(dt): break
+        if dt is None or not is_within_period(dt): continue
+        news_list.append({
+            "source": "Subaru",
+            "title": clean_text(link_node.get_text(strip=True)),
+            "url": link,
+            "date": dt,
+            "summary": "",
+        })
+    return news_list
+
 def fetch_subaru_html():
     try:
-        resp = requests.get("https://www.subaru.co.jp/news/", headers=HEADERS, timeout=10)
-        resp.raise_for_status()
-        resp.encoding = resp.apparent_encoding
-        soup = BeautifulSoup(resp.content, "html.parser")
-        news_list = []
-        for item in soup.select(".section_news-list li, .news-list li, ul li"):
-            link_node = item.select_one("a")
-            if not link_node or not link_node.get("href"): continue
-            m = re.search(r"(\d{4}[/年]\d{1,2}[/月]\d{1,2})", item.get_text(" ", strip=True))
-            dt = parse_datetime_safe(normalize_date_text(m.group(1))) if m else None
-            if dt is None or not is_within_period(dt): continue
-            link = urljoin("https://www.subaru.co.jp", link_node.get("href"))
-            news_list.append({
-                "source": "Subaru",
-                "title": clean_text(link_node.get_text(strip=True)),
-                "url": link,
-                "date": dt,
-                "summary": trim_summary(fetch_page_summary(link), limit=200)
-            })
-        return news_list
-    except Exception:
+        return fetch_listing(LISTING_URLS["Subaru"], functools.partial(parse_subaru_html, watermark=get_watermark("Subaru")))
+    except Exception as e:
+        telemetry.record_error(e)
         return []
 
+def parse_nissan(content, watermark=None):
+    soup = BeautifulSoup(content, HTML_PARSER, parse_only=SoupStrainer("div", class_="release-item"))
+    known = KnownItems(watermark)
+    news_list = []
+    for item in soup.select("div.release-item"):
+        title_node = item.select_one("div.title a")
+        if not title_node: continue
+        link = urljoin("https://global.nissannews.com", title_node.get("href"))
+        if known.skip(link):
+            news_list.append(known.marker(link))
+            if known.stop: break
+            continue
+        date_node = item.select_one("time.pub-date")
+        dt = parse_datetime_safe(date_node.get("datetime"), "Nissan") if date_node else None
+        if dt is None: dt = parse_datetime_safe(normalize_date_text(date_node.get_text(strip=True)), "Nissan") if date_node else None
+        if known.passed(dt): break
+        if dt is None or not is_within_period(dt): continue
+        news_list.append({
+            "source": "Nissan",
+            "title": clean_text(title_node.get_text(strip=True)),
+            "url": link,
+            "date": dt,
+            "summary": "",
+        })
+    return news_list
+
 def fetch_nissan():
     try:
-        resp = requests.get("https://global.nissannews.com/ja-JP/channels/news", headers=HEADERS, timeout=10)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.content, "html.parser")
-        news_list = []
-        for item in soup.select("div.release-item"):
-            title_node = item.select_one("div.title a")
-            if not title_node: continue
-            link = urljoin("https://global.nissannews.com", title_node.get("href"))
-            date_node = item.select_one("time.pub-date")
-            dt = parse_datetime_safe(date_node.get("datetime")) if date_node else None
-            if dt is None: dt = parse_datetime_safe(normalize_date_text(date_node.get_text(strip=True))) if date_node else None
-            if dt is None or not is_within_period(dt): continue
-            news_list.append({
-                "source": "Nissan",
-                "title": clean_text(title_node.get_text(strip=True)),
-                "url": link,
-                "date": dt,
-                "summary": trim_summary(fetch_page_summary(link), limit=200),
-            })
-        return news_list
-    except Exception:
+        return fetch_listing(LISTING_URLS["Nissan"], functools.partial(parse_nissan, watermark=get_watermark("Nissan")))
+    except Exception as e:
+        telemetry.record_error(e)
         return []
 
-def collect_news():
-    sources = [
-        ("Toyota", RSS_SOURCES["Toyota"], "rss_multi"),
-        ("Honda", RSS_SOURCES["Honda"], "rss_multi"),
-        ("Mazda", RSS_SOURCES["Mazda"], "rss_multi"),
-        ("Subaru", RSS_SOURCES["Subaru"], "rss_multi"),
-        ("Daihatsu", "", "daihatsu"),
-        ("Suzuki", "", "suzuki"),
-        ("Mitsubishi Motors", "", "mitsubishi"),
-        ("Nissan", "", "nissan"),
-    ]
-    all_news = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-        future_map = {}
-        for name, data, method in sources:
-            if method == "rss_multi": future = executor.submit(fetch_rss_with_fallback, data, name)
-            elif method == "daihatsu": future = executor.submit(fetch_daihatsu)
-            elif method == "suzuki": future = executor.submit(fetch_suzuki)
-            elif method == "mitsubishi": future = executor.submit(fetch_mitsubishi)
-            elif method == "nissan": future = executor.submit(fetch_nissan)
-            else: continue
-            future_map[future] = name
-        for future in concurrent.futures.as_completed(future_map):
+LISTING_PARSERS = {
+    "Honda": parse_honda_html,
+    "Mazda": parse_mazda_html,
+    "Subaru": parse_subaru_html,
+    "Daihatsu": parse_daihatsu,
+    "Suzuki": parse_suzuki,
+    "Mitsubishi Motors": parse_mitsubishi,
+    "Nissan": parse_nissan,
+}
+
+HTML_FALLBACKS = {
+    "Subaru": fetch_subaru_html,
+    "Mitsubishi Motors": fetch_mitsubishi,
+    "Honda": fetch_honda_html,
+    "Mazda": fetch_mazda_html,
+}
+
+SOURCES = [
+    ("Toyota", RSS_SOURCES["Toyota"], "rss_multi"),
+    ("Honda", RSS_SOURCES["Honda"], "rss_multi"),
+    ("Mazda", RSS_SOURCES["Mazda"], "rss_multi"),
+    ("Subaru", RSS_SOURCES["Subaru"], "rss_multi"),
+    ("Daihatsu", "", "daihatsu"),
+    ("Suzuki", "", "suzuki"),
+    ("Mitsubishi Motors", "", "mitsubishi"),
+    ("Nissan", "", "nissan"),
+]
+SOURCE_NAMES = [name for name, _, _ in SOURCES]
+
+def _run_source(stats, deadline, fn, *args):
+    with telemetry.source_scope(stats):
+        stats.deadline = min(deadline, time.monotonic() + SOURCE_BUDGET_SECONDS)
+        stats.started = time.perf_counter()
+        try:
+            news = fn(*args)
+        finally:
+            stats.duration = time.perf_counter() - stats.started
+        stats.add("items_kept", len(news))
+        claim_items(news)
+        return news
+
+def record_health(name, stats, news):
+    # A source fails when it produced nothing and had errors or ran out of time
+    key = breaker.source_key(name)
+    if news or not (stats.errors or stats.incomplete):
+        breaker.record_success(key)
+    else:
+        breaker.record_failure(key)
+
+def stored_items_for(stored_news, name):
+    # What a skipped source serves instead: its last-known items from the store
+    return [dict(item) for item in stored_news if item.get("source") == name and is_within_period(item.get("date"))]
+
+def sort_news(news_list):
+    news_list.sort(key=lambda item: item.get("date").timestamp() if item.get("date") else 0, reverse=True)
+    return news_list
+
+def begin_run(sources=None):
+    # Shared by both engines: selects sources, loads what the store already knows and
+    # splits off sources whose circuit breaker is open
+    selected = [entry for entry in SOURCES if sources is None or entry[0] in sources]
+    run = telemetry.RunStats([name for name, _, _ in selected])
+    stored_news = load_news()
+    summary_cache.seed(stored_news, min_length=MIN_SUMMARY_LENGTH)
+    set_known_items(stored_news, load_watermarks())
+    # Breaker state may have been changed by another process since the last run
+    breaker.reset()
+    active, skipped = [], []
+    for name, data, method in selected:
+        if breaker.allow(breaker.source_key(name)):
+            active.append((name, data, method))
+        else:
+            run.sources[name].skipped = True
+            skipped.append(name)
+    return run, stored_news, active, skipped
+
+def finish_run(run, persist=True):
+    # Without persist (cli.py --dry-run) the caches, breaker state and run log stay as they were
+    if persist:
+        http_cache.flush()
+        summary_cache.flush()
+        endpoint_cache.flush()
+        breaker.flush()
+    run.finish()
+    telemetry.save_run(run, persist)
+
+def iter_collect_news(sources=None, deadline=None, persist=True):
+    # Yields (source, items) as each source finishes, fastest first.
+    # deadline: seconds for the whole run (COLLECT_DEADLINE_SECONDS by default)
+    if COLLECT_ENGINE == "async":
+        import async_collectors
+        yield from async_collectors.iter_collect_news(sources, deadline, persist)
+        return
+    deadline = time.monotonic() + (COLLECT_DEADLINE_SECONDS if deadline is None else deadline)
+    run, stored_news, active, skipped = begin_run(sources)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+    future_map = {}
+    for name, data, method in active:
+        stats = run.sources[name]
+        if method == "rss_multi": future = executor.submit(_run_source, stats, deadline, fetch_rss_with_fallback, data, name)
+        elif method == "daihatsu": future = executor.submit(_run_source, stats, deadline, fetch_daihatsu)
+        elif method == "suzuki": future = executor.submit(_run_source, stats, deadline, fetch_suzuki)
+        elif method == "mitsubishi": future = executor.submit(_run_source, stats, deadline, fetch_mitsubishi)
+        elif method == "nissan": future = executor.submit(_run_source, stats, deadline, fetch_nissan)
+        else: continue
+        future_map[future] = name
+    try:
+        for name in skipped:
+            yield name, sort_news(stored_items_for(stored_news, name))
+        # Sources get a short grace period past the deadline to hand back what they have
+        for future in concurrent.futures.as_completed(future_map, timeout=max(0, deadline - time.monotonic()) + DEADLINE_GRACE_SECONDS):
+            name = future_map[future]
             try:
-                all_news.extend(future.result())
-            except Exception:
-                pass
-    all_news.sort(key=lambda item: item.get("date").timestamp() if item.get("date") else 0, reverse=True)
-    return all_news
+                news = future.result()
+            except Exception as e:
+                run.sources[name].record_error(e)
+                news = []
+            record_health(name, run.sources[name], news)
+            yield name, sort_news(news)
+    except concurrent.futures.TimeoutError:
+        for future, name in future_map.items():
+            if not future.done():
+                run.sources[name].incomplete = True
+                breaker.record_failure(breaker.source_key(name))
+    finally:
+        # Stragglers are left to finish in the background; their results are dropped
+        executor.shutdown(wait=False, cancel_futures=True)
+        finish_run(run, persist)
+
+def collect_news(sources=None, deadline=None):
+    all_news = []
+    for _, news in iter_collect_news(sources, deadline):
+        all_news.extend(news)
+    return sort_news(all_news)
 
 if __name__ == "__main__":
     items = collect_news()
@@ -1,14 +1,32 @@
 import json
 import os
+import threading
+import time
+from collections import Counter
 from datetime import datetime, timezone, timedelta
 
+from dedup import DuplicateIndex, window_start
+from search_index import SearchIndex
+
 DATA_FILE = "news_data.json"
 HISTORY_FILE = "fetch_history.json"
 MAX_NEWS = 200
 MAX_HISTORY = 10
 
+# "json" (default) or "sqlite"; the SQLite store keeps history for RETENTION_DAYS instead of MAX_NEWS items
+STORAGE_BACKEND = os.environ.get("NEWS_STORAGE_BACKEND", "json")
+RETENTION_DAYS = 180
+
+# Per-source high-water marks (newest stored date and recent URLs) for incremental collection
+WATERMARK_FILE = "watermarks.json"
+MAX_WATERMARK_URLS = 100
+
 JST = timezone(timedelta(hours=9))
 
+# Readers retry briefly instead of treating a file that is being replaced as empty
+READ_RETRIES = 5
+READ_RETRY_SECONDS = 0.05
+
 def serialize_datetime(obj):
     if isinstance(obj, datetime):
         return obj.isoformat()
@@ -22,48 +40,197 @@ def deserialize_news(item):
             pass
     return item
 
-def load_news():
-    if not os.path.exists(DATA_FILE):
-        return []
+def read_json_file(path, default):
+    for attempt in range(READ_RETRIES):
+        if not os.path.exists(path):
+            return default
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (ValueError, OSError):
+            # Half-written (older writers) or locked by a rename in progress (Windows)
+            time.sleep(READ_RETRY_SECONDS * (attempt + 1))
+        except Exception:
+            return default
+    return default
+
+def write_text_file(path, text):
+    # Written to a temporary file next to the target and renamed over it, so readers
+    # in other threads/processes see either the old or the new content, never a partial file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
     try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return [deserialize_news(item) for item in data]
-    except Exception:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        for attempt in range(READ_RETRIES):
+            try:
+                os.replace(tmp_path, path)
+                return True
+            except PermissionError:
+                # Windows refuses while a reader has the target open
+                if attempt == READ_RETRIES - 1:
+                    raise
+                time.sleep(READ_RETRY_SECONDS * (attempt + 1))
+    except Exception as e:
+        print(f"Error saving {path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+def write_json_file(path, data, indent=None):
+    try:
+        text = json.dumps(data, ensure_ascii=False, indent=indent, default=serialize_datetime)
+    except Exception as e:
+        print(f"Error saving {path}: {e}")
+        return False
+    return write_text_file(path, text)
+
+class JsonStateFile:
+    # A JSON object kept in memory across a run (caches, breaker state): read on first use,
+    # written back by flush() only when marked dirty. convert turns the loaded dict into the
+    # in-memory form. Callers hold lock while using entries().
+    def __init__(self, path, convert=None):
+        self.path = path
+        self.convert = convert
+        self.lock = threading.Lock()
+        self.dirty = False
+        self._entries = None
+
+    def entries(self):
+        if self._entries is None:
+            data = read_json_file(self.path, {})
+            data = data if isinstance(data, dict) else {}
+            self._entries = self.convert(data) if self.convert else data
+        return self._entries
+
+    def reset(self):
+        # Drops the in-memory copy; the next access reloads from disk
+        with self.lock:
+            self._entries = None
+            self.dirty = False
+
+    def flush(self):
+        with self.lock:
+            if not self.dirty or self._entries is None:
+                return
+            if write_json_file(self.path, dict(self._entries)):
+                self.dirty = False
+
+def use_sqlite():
+    return STORAGE_BACKEND == "sqlite"
+
+def _sqlite():
+    import sqlite_store
+    if not sqlite_store.is_migrated():
+        sqlite_store.migrate(_load_news_json(), _load_history_json())
+    return sqlite_store
+
+def news_limit():
+    return None if use_sqlite() else MAX_NEWS
+
+def load_news():
+    if use_sqlite():
+        try:
+            return [deserialize_news(item) for item in _sqlite().load_news()]
+        except Exception:
+            return []
+    return _load_news_json()
+
+def _load_news_json():
+    data = read_json_file(DATA_FILE, [])
+    if not isinstance(data, list):
         return []
+    return [deserialize_news(item) for item in data]
 
 def save_news(news_list):
-    # Sort and take top 200
+    # Sort and take top 200. Returns True when the store was written
     news_list.sort(key=lambda x: x.get("date").timestamp() if x.get("date") else 0, reverse=True)
+    if use_sqlite():
+        try:
+            store = _sqlite()
+            store.upsert_news(news_list)
+            store.prune_news((datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)).timestamp())
+            save_watermarks(news_list)
+            return True
+        except Exception as e:
+            print(f"Error saving news: {e}")
+            return False
     to_save = news_list[:MAX_NEWS]
     
-    try:
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(to_save, f, ensure_ascii=False, indent=2, default=serialize_datetime)
-    except Exception as e:
-        print(f"Error saving news: {e}")
+    if not write_json_file(DATA_FILE, to_save, indent=2):
+        return False
+    save_watermarks(to_save)
+    return True
+
+def save_watermarks(news_list):
+    # news_list is sorted newest first
+    marks = {}
+    for item in news_list:
+        source, url = item.get("source"), item.get("url")
+        if not source or not url:
+            continue
+        mark = marks.setdefault(source, {"newest": None, "urls": [], "pending": []})
+        # Items cut short by the collection deadline are not "known"; the next run reads on until it reaches them
+        if item.get("incomplete"):
+            mark["pending"].append(url)
+            continue
+        if mark["newest"] is None and isinstance(item.get("date"), datetime):
+            mark["newest"] = item["date"]
+        if len(mark["urls"]) < MAX_WATERMARK_URLS:
+            mark["urls"].append(url)
+    write_json_file(WATERMARK_FILE, marks)
+
+def load_watermarks():
+    data = read_json_file(WATERMARK_FILE, {})
+    marks = {}
+    if not isinstance(data, dict):
+        return marks
+    for source, mark in data.items():
+        newest = mark.get("newest")
+        try:
+            newest = datetime.fromisoformat(newest) if newest else None
+        except ValueError:
+            newest = None
+        marks[source] = {"newest": newest, "urls": set(mark.get("urls") or []), "pending": set(mark.get("pending") or [])}
+    return marks
 
 def load_history():
-    if not os.path.exists(HISTORY_FILE):
-        return []
-    try:
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return []
+    if use_sqlite():
+        try:
+            return _sqlite().load_history(MAX_HISTORY)
+        except Exception:
+            return []
+    return _load_history_json()
+
+def _load_history_json():
+    history = read_json_file(HISTORY_FILE, [])
+    return history if isinstance(history, list) else []
 
 def save_history(timestamp_str):
+    if use_sqlite():
+        try:
+            _sqlite().add_history(timestamp_str, MAX_HISTORY)
+        except Exception as e:
+            print(f"Error saving history: {e}")
+        return
     history = load_history()
     history.insert(0, timestamp_str)
     history = history[:MAX_HISTORY]
-    try:
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print(f"Error saving history: {e}")
+    write_json_file(HISTORY_FILE, history, indent=2)
 
 def merge_news(old_news, new_news):
-    # Use URL as unique key
+    # Use URL as unique key. A new item that is a stored article under another URL
+    # (see dedup.py) is dropped, so the stored copy keeps its URL
+    if new_news:
+        new_urls = {item.get("url") for item in new_news}
+        duplicates = DuplicateIndex([item for item in old_news if item.get("url") not in new_urls], since=window_start(new_news))
+        fresh = []
+        for item in new_news:
+            if duplicates.find(item) is None:
+                duplicates.add([item])
+                fresh.append(item)
+        new_news = fresh
     seen_urls = set()
     merged = []
     
@@ -75,4 +242,52 @@ def merge_news(old_news, new_news):
             seen_urls.add(url)
             
     merged.sort(key=lambda x: x.get("date").timestamp() if x.get("date") else 0, reverse=True)
-    return merged[:MAX_NEWS]
+    limit = news_limit()
+    if limit: merged = merged[:limit]
+    return merged
+
+def file_version(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def store_version():
+    if use_sqlite():
+        import sqlite_store
+        return ("sqlite", file_version(sqlite_store.DB_FILE), file_version(sqlite_store.DB_FILE + "-wal"))
+    return ("json", file_version(DATA_FILE), file_version(HISTORY_FILE))
+
+_snapshot_lock = threading.Lock()
+_snapshot = None
+_snapshot_index = SearchIndex()
+
+def load_snapshot():
+    # Process-wide, read-only view of the store shared by all dashboard sessions.
+    # Rebuilt only when the files change, so reruns skip JSON parsing and aggregation.
+    global _snapshot
+    with _snapshot_lock:
+        version = store_version()
+        if _snapshot is not None and _snapshot["version"] == version:
+            return _snapshot
+        # News and history are read as a pair: if either changes while being read, read again
+        for _ in range(READ_RETRIES):
+            news = load_news()
+            history = load_history()
+            current = store_version()
+            if current == version:
+                break
+            version = current
+        _snapshot_index.sync(news)
+        dates = [item["date"].astimezone(JST).date() for item in news if isinstance(item.get("date"), datetime)]
+        _snapshot = {
+            "version": version,
+            "news": news,
+            "history": history,
+            "source_counts": Counter(item.get("source", "Unknown") for item in news),
+            "sources": sorted(set(item["source"] for item in news)),
+            "date_range": (min(dates), max(dates)) if dates else None,
+            "index": _snapshot_index,
+        }
+        return _snapshot
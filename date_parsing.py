@@ -0,0 +1,75 @@
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+from dateutil import parser as date_parser
+
+# Dates without an offset are JST, matching is_within_period
+JST = timezone(timedelta(hours=9))
+CACHE_SIZE = 8192
+
+_ymd_re = re.compile(r"^(\d{4})\s*[./年-]\s*(\d{1,2})\s*[./月-]\s*(\d{1,2})\s*日?$")
+_rfc822_re = re.compile(r"^(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\s")
+_iso_re = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?:Z|[+-]\d{2}:?\d{2})?$")
+
+def _jst(dt):
+    return dt if dt.tzinfo else dt.replace(tzinfo=JST)
+
+def _parse_iso(text):
+    if not _iso_re.match(text):
+        return None
+    try:
+        return _jst(datetime.fromisoformat(text.replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+def _parse_rfc822(text):
+    if not _rfc822_re.match(text):
+        return None
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if dt.tzinfo:
+        return dt
+    # Naive for "-0000" (UTC, local offset unknown), a missing zone and names like "JST"
+    return dt.replace(tzinfo=timezone.utc) if text.endswith("-0000") else _jst(dt)
+
+def _parse_ymd(text):
+    m = _ymd_re.match(text)
+    if not m:
+        return None
+    try:
+        return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)), tzinfo=JST)
+    except ValueError:
+        return None
+
+PARSERS = {"iso": _parse_iso, "rfc822": _parse_rfc822, "ymd": _parse_ymd}
+
+_winners = {}
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_text(text, hint):
+    names = ([hint] if hint in PARSERS else []) + [name for name in PARSERS if name != hint]
+    for name in names:
+        dt = PARSERS[name](text)
+        if dt is not None:
+            return name, dt
+    try:
+        return "dateutil", _jst(date_parser.parse(text))
+    except (ValueError, OverflowError, TypeError):
+        return None, None
+
+def parse_date(value, source=None):
+    # Precompiled formats first (the one that last worked for this source leads), dateutil only on a miss
+    text = " ".join(str(value).split())
+    if not text:
+        return None
+    name, dt = _parse_text(text, _winners.get(source))
+    if source and name in PARSERS:
+        _winners[source] = name
+    return dt
+
+def cache_info():
+    return _parse_text.cache_info()
@@ -0,0 +1,137 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from datetime import datetime
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Duplicate detection for items that reach us twice: the same article under another URL form
+# (tracking parameters, trailing slash, http/https, www.) or under another path altogether
+# (feed vs. listing page), which is caught by a SimHash of the title.
+TRACKING_PARAMS = {"fbclid", "gclid", "yclid", "dclid", "msclkid", "mc_cid", "mc_eid", "_ga", "ref", "from"}
+TRACKING_PREFIXES = ("utm_",)
+INDEX_PAGES = ("index.html", "index.htm", "index.php")
+
+SHINGLE_SIZE = 3
+SIMHASH_BITS = 64
+# 4 bands of 16 bits: two fingerprints within MAX_DISTANCE bits share at least one band
+BANDS = 4
+MAX_DISTANCE = 3
+# Shorter titles ("お知らせ", numbered notices) are only matched by URL
+MIN_TITLE_LENGTH = 10
+# Near-identical titles further apart than this are different articles (recurring notices)
+DATE_WINDOW_HOURS = 72
+CACHE_SIZE = 65536
+
+_label_re = re.compile(r"【[^】]*】|\[[^\]]*\]")
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonical_url(url):
+    # Comparison key only; stored items keep the URL they were collected with
+    try:
+        parts = urlsplit(str(url).strip())
+    except ValueError:
+        return str(url)
+    scheme = "https" if parts.scheme in ("http", "https") else parts.scheme
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path or "/"
+    while "//" in path:
+        path = path.replace("//", "/")
+    for page in INDEX_PAGES:
+        if path.endswith("/" + page):
+            path = path[:-len(page)]
+            break
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+def normalize_title(text):
+    # NFKC and lower case, without labels like 【新型】 and without whitespace, punctuation and symbols
+    text = _label_re.sub("", unicodedata.normalize("NFKC", str(text or ""))).lower()
+    return "".join(ch for ch in text if unicodedata.category(ch)[0] not in "PSZC")
+
+def _shingle_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=SIMHASH_BITS // 8).digest(), "big")
+
+@lru_cache(maxsize=CACHE_SIZE)
+def fingerprint(title):
+    # SimHash over character shingles (Japanese has no word boundaries); None for short titles
+    text = normalize_title(title)
+    if len(text) < MIN_TITLE_LENGTH:
+        return None
+    counts = [0] * SIMHASH_BITS
+    for shingle in {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}:
+        h = _shingle_hash(shingle)
+        for bit in range(SIMHASH_BITS):
+            counts[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, count in enumerate(counts) if count > 0)
+
+def _bands(fp):
+    width = SIMHASH_BITS // BANDS
+    return [(fp >> (band * width)) & ((1 << width) - 1) for band in range(BANDS)]
+
+def _timestamp(item):
+    dt = item.get("date")
+    return dt.timestamp() if isinstance(dt, datetime) else None
+
+def _close_in_time(a, b):
+    ta, tb = _timestamp(a), _timestamp(b)
+    return ta is None or tb is None or abs(ta - tb) <= DATE_WINDOW_HOURS * 3600
+
+def window_start(items):
+    # Oldest timestamp a near-duplicate of one of items can have
+    stamps = [ts for ts in (_timestamp(item) for item in items) if ts is not None]
+    return min(stamps) - DATE_WINDOW_HOURS * 3600 if stamps else None
+
+class DuplicateIndex:
+    def __init__(self, items=None, since=None):
+        # Items dated before since are left out: a copy of an article carries about the same date
+        self.lock = threading.RLock()
+        self.since = since
+        self.urls = {}
+        self.bands = [{} for _ in range(BANDS)]
+        if items:
+            self.add(items)
+
+    def __len__(self):
+        return len(self.urls)
+
+    def _excluded(self, item):
+        ts = _timestamp(item)
+        return self.since is not None and ts is not None and ts < self.since
+
+    def add(self, items):
+        with self.lock:
+            for item in items:
+                url = item.get("url")
+                if not url or self._excluded(item):
+                    continue
+                self.urls.setdefault(canonical_url(url), item)
+                fp = fingerprint(item.get("title"))
+                if fp is None:
+                    continue
+                for band, key in enumerate(_bands(fp)):
+                    self.bands[band].setdefault(key, []).append((fp, item))
+
+    def find(self, item):
+        # The indexed item that is the same article (possibly the very same URL), else None
+        url = item.get("url")
+        if not url or self._excluded(item):
+            return None
+        with self.lock:
+            match = self.urls.get(canonical_url(url))
+            if match is not None:
+                return match
+            fp = fingerprint(item.get("title"))
+            if fp is None:
+                return None
+            for band, key in enumerate(_bands(fp)):
+                for other_fp, other in self.bands[band].get(key, ()):
+                    if bin(fp ^ other_fp).count("1") <= MAX_DISTANCE and _close_in_time(item, other):
+                        return other
+        return None
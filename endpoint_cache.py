@@ -0,0 +1,32 @@
+import time
+
+from data_manager import JsonStateFile
+
+# Per source, the feed URL (or "html" for the listing scraper) that last returned items.
+# It is tried first next time; after ENDPOINT_RECHECK_HOURS the configured order is used again.
+ENDPOINT_CACHE_FILE = "endpoint_cache.json"
+ENDPOINT_RECHECK_HOURS = 24
+
+_state = JsonStateFile(ENDPOINT_CACHE_FILE)
+
+def get(source):
+    with _state.lock:
+        entry = _state.entries().get(source)
+    if not isinstance(entry, dict) or time.time() - entry.get("saved_at", 0) > ENDPOINT_RECHECK_HOURS * 3600:
+        return None
+    return entry.get("endpoint")
+
+def remember(source, endpoint):
+    with _state.lock:
+        entries = _state.entries()
+        previous = entries.get(source)
+        if isinstance(previous, dict) and previous.get("endpoint") == endpoint and time.time() - previous.get("saved_at", 0) <= ENDPOINT_RECHECK_HOURS * 3600:
+            return
+        entries[source] = {"endpoint": endpoint, "saved_at": time.time()}
+        _state.dirty = True
+
+def reset():
+    _state.reset()
+
+def flush():
+    _state.flush()
@@ -0,0 +1,143 @@
+import json
+import os
+import socket
+import threading
+import time
+
+# Cross-process lock held as an exclusively created file. os.O_EXCL works the same on
+# Windows and POSIX. A lock left behind by a crashed process is broken once it is older
+# than stale_seconds, or at once when its holder ran on this host and is no longer alive.
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == 5  # ERROR_ACCESS_DENIED: exists, owned by someone else
+        try:
+            code = ctypes.c_ulong()
+            return not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)) or code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # PermissionError: exists, owned by someone else
+        pass
+    return True
+
+def _identity(st):
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+class FileLock:
+    def __init__(self, path, stale_seconds=600):
+        self.path = path
+        self.stale_seconds = stale_seconds
+        self.held = False
+        self.identity = None
+
+    def acquire(self, blocking=False, poll_seconds=0.5):
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self._break_stale():
+                    continue
+                if not blocking:
+                    return False
+                time.sleep(poll_seconds)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"pid": os.getpid(), "host": socket.gethostname(), "acquired_at": time.time()}, f)
+                f.flush()
+                self.identity = _identity(os.fstat(f.fileno()))
+            self.held = True
+            return True
+
+    def release(self):
+        if not self.held:
+            return
+        self.held = False
+        try:
+            # Left alone when it was taken over as stale in the meantime
+            if _identity(os.stat(self.path)) == self.identity:
+                os.remove(self.path)
+        except OSError:
+            pass
+
+    def locked(self):
+        # Held by anyone (this process included) and not stale
+        state = self._inspect()
+        return state is not None and not self._stale(*state)
+
+    def wait_released(self, poll_seconds=0.5, timeout=None):
+        start = time.monotonic()
+        while self.locked():
+            if timeout is not None and time.monotonic() - start > timeout:
+                return False
+            time.sleep(poll_seconds)
+        return True
+
+    def _inspect(self):
+        # (stat, owner) of the current lock file, None when there is none
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                st = os.fstat(f.fileno())
+                try:
+                    owner = json.load(f)
+                except ValueError:
+                    # Still being written by its creator
+                    owner = {}
+        except FileNotFoundError:
+            return None
+        except OSError:
+            # Being replaced (Windows); counts as held
+            return None, {}
+        return st, owner if isinstance(owner, dict) else {}
+
+    def _stale(self, st, owner):
+        if st is None:
+            return False
+        if time.time() - st.st_mtime >= self.stale_seconds:
+            return True
+        pid = owner.get("pid")
+        return owner.get("host") == socket.gethostname() and isinstance(pid, int) and not _pid_alive(pid)
+
+    def _break_stale(self):
+        # True when acquire should try again: the lock is gone or a stale one was moved away
+        state = self._inspect()
+        if state is None:
+            return True
+        st, owner = state
+        if not self._stale(st, owner):
+            return False
+        # Only one process can rename a given file away, so two breakers never both remove it.
+        # A breaker that judged an older file moved a fresh lock instead: put that one back
+        moved = f"{self.path}.{os.getpid()}.{threading.get_ident()}.stale"
+        try:
+            os.rename(self.path, moved)
+        except FileNotFoundError:
+            return True
+        except OSError:
+            return False
+        try:
+            if _identity(os.stat(moved)) != _identity(st):
+                os.link(moved, self.path)
+        except OSError:
+            pass
+        try:
+            os.remove(moved)
+        except OSError:
+            pass
+        return True
+
+    def __enter__(self):
+        self.acquire(blocking=True)
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -0,0 +1,72 @@
+import hashlib
+
+import http_client
+from data_manager import JsonStateFile, deserialize_news
+
+# Validators (ETag / Last-Modified / body hash) and extracted items per feed URL
+FEED_CACHE_FILE = "feed_cache.json"
+
+_state = JsonStateFile(FEED_CACHE_FILE)
+
+def body_hash(content):
+    return hashlib.sha256(content or b"").hexdigest()
+
+def cached_items(url):
+    with _state.lock:
+        entry = _state.entries().get(url)
+        if not entry or "items" not in entry:
+            return None
+        return [deserialize_news(dict(item)) for item in entry["items"]]
+
+def _remember(url, resp, items):
+    with _state.lock:
+        _state.entries()[url] = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "body_hash": body_hash(resp.content),
+            "items": [dict(item) for item in items],
+        }
+        _state.dirty = True
+
+def prepare(url, headers):
+    # The cached entry and the request headers carrying its validators
+    with _state.lock:
+        entry = dict(_state.entries().get(url) or {})
+    request_headers = dict(headers)
+    if "items" in entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+    return entry, request_headers
+
+def conditional_get(url, headers, timeout):
+    # Returns (response, None) when the body has to be parsed,
+    # or (None, items) when the previously extracted items are still valid.
+    entry, request_headers = prepare(url, headers)
+    resp = http_client.get(url, headers=request_headers, timeout=timeout)
+    return resolve(url, entry, resp)
+
+def resolve(url, entry, resp):
+    if resp.status_code == 304 and "items" in entry:
+        return None, cached_items(url)
+    resp.raise_for_status()
+    if "items" in entry and entry.get("body_hash") == body_hash(resp.content):
+        _remember(url, resp, entry["items"])
+        return None, cached_items(url)
+    return resp, None
+
+def store(url, resp, items):
+    _remember(url, resp, items)
+
+def forget(url):
+    # Listings cut short by the deadline are fetched in full again next time
+    with _state.lock:
+        if _state.entries().pop(url, None) is not None:
+            _state.dirty = True
+
+def reset():
+    _state.reset()
+
+def flush():
+    _state.flush()
@@ -0,0 +1,175 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+import telemetry
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+# Connection pooling (keep-alive) per host
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 8
+
+# Retries on throttling / server errors
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.5
+BACKOFF_JITTER = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Longest Retry-After wait honoured (seconds)
+MAX_RETRY_AFTER_SECONDS = 60
+
+# Politeness: token bucket per host
+RATE_PER_HOST = 4.0
+BURST_PER_HOST = 4
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    pass
+
+# Optional callable mapping a URL to the one actually requested (used by the benchmark replay server)
+URL_REWRITE = None
+
+_lock = threading.Lock()
+_session = None
+_buckets = {}
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        # Takes a token and returns 0, or returns the seconds to wait before trying again
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            wait = (1 - self.tokens) / self.rate
+        return wait + random.uniform(0, wait * 0.1)
+
+    def acquire(self):
+        while True:
+            wait = self.reserve()
+            if not wait:
+                return
+            time.sleep(wait)
+
+def retry_wait_fits(seconds):
+    # False when waiting that long before a retry would run past the current source's deadline
+    remaining = telemetry.remaining()
+    return seconds is None or remaining is None or seconds < remaining
+
+class DeadlineRetry(Retry):
+    # No further attempts once the current source is out of time. A Retry-After wait is capped
+    # at MAX_RETRY_AFTER_SECONDS, and one that would run past the deadline ends the retries with
+    # the response in hand, as in the asyncio engine
+    def is_exhausted(self):
+        return telemetry.expired() or super().is_exhausted()
+
+    def get_retry_after(self, response):
+        seconds = super().get_retry_after(response)
+        return None if seconds is None else min(seconds, MAX_RETRY_AFTER_SECONDS)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if (response is not None and self.respect_retry_after_header and response.status in RETRY_STATUSES
+                and not retry_wait_fits(self.get_retry_after(response))):
+            raise MaxRetryError(_pool, url, ResponseError(f"Retry-After {response.headers.get('Retry-After')} runs past the deadline"))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+    def sleep_for_retry(self, response=None):
+        seconds = self.get_retry_after(response) if response is not None else None
+        if seconds is None:
+            return False
+        remaining = telemetry.remaining()
+        time.sleep(max(0, seconds if remaining is None else min(seconds, remaining)))
+        return True
+
+def _build_retry():
+    options = dict(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        return DeadlineRetry(backoff_jitter=BACKOFF_JITTER, **options)
+    except TypeError:
+        # urllib3 < 2 has no jitter option
+        return DeadlineRetry(**options)
+
+def get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=_build_retry())
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept-Encoding": ACCEPT_ENCODING, "Connection": "keep-alive"})
+            _session = session
+        return _session
+
+def bucket_for(url):
+    host = urlparse(url).netloc
+    with _lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(RATE_PER_HOST, BURST_PER_HOST)
+        return _buckets[host]
+
+def clamp_timeout(url, timeout):
+    # Timeouts never run past the current source's deadline; returns (timeout, clamped)
+    budget = telemetry.remaining()
+    if budget is None or budget >= timeout:
+        return timeout, False
+    if budget <= 0:
+        telemetry.mark_incomplete()
+        raise DeadlineExceeded(f"deadline exceeded before {url}")
+    return budget, True
+
+def get(url, headers=None, timeout=10, stream=False):
+    bucket_for(url).acquire()
+    timeout, clamped = clamp_timeout(url, timeout)
+    request_url = URL_REWRITE(url) if URL_REWRITE is not None else url
+    start = time.perf_counter()
+    try:
+        resp = get_session().get(request_url, headers=headers, timeout=timeout, stream=stream)
+    except Exception as e:
+        telemetry.record_request(url, None, time.perf_counter() - start, 0, e)
+        if clamped and telemetry.expired():
+            telemetry.mark_incomplete()
+        raise
+    # Streamed bodies are counted by the reader as they are consumed
+    telemetry.record_request(url, resp.status_code, time.perf_counter() - start, 0 if stream else len(resp.content))
+    return resp
+
+def close():
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _buckets.clear()
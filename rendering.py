@@ -0,0 +1,63 @@
+import html
+from datetime import datetime
+from functools import lru_cache
+
+# News cards as HTML. A page of cards is sent as one pre-rendered block; each card is
+# built once per (source, title, url, date, summary) and every field is escaped.
+PAGE_SIZES = [20, 50, 100]
+CACHE_SIZE = 4096
+SAFE_SCHEMES = ("http://", "https://")
+
+CARD_CSS = """
+.news-card { background: #fff; border-radius: 12px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.05); border: 1px solid #eee; }
+.news-source { font-size: 0.75rem; color: #666; font-weight: 700; background: #f0f0f0; padding: 2px 8px; border-radius: 4px; }
+.news-date { font-size: 0.8rem; color: #999; float: right; }
+.news-title { font-size: 1.15rem; font-weight: 700; margin: 10px 0; }
+.news-title a { text-decoration: none; color: #333; }
+.news-summary { font-size: 0.9rem; color: #555; line-height: 1.6; }
+.read-more { font-size: 0.85rem; color: #e63946; font-weight: 600; text-decoration: none; }
+"""
+
+def date_text(value):
+    if isinstance(value, datetime):
+        return value.strftime("%Y/%m/%d")
+    return str(value or "")
+
+def safe_url(url):
+    # Only http(s) links; anything else (javascript:, data:) becomes a dead link
+    url = str(url or "").strip()
+    return url if url.lower().startswith(SAFE_SCHEMES) else "#"
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _card(source, title, url, date, summary):
+    href = html.escape(safe_url(url), quote=True)
+    # No blank lines or indentation: the block must stay a single raw HTML block for st.markdown
+    return (
+        '<div class="news-card">'
+        f'<div><span class="news-source">{html.escape(source)}</span><span class="news-date">{html.escape(date)}</span></div>'
+        f'<div class="news-title"><a href="{href}" target="_blank" rel="noopener noreferrer">{html.escape(title)}</a></div>'
+        f'<div class="news-summary">{html.escape(summary)}</div>'
+        f'<a href="{href}" target="_blank" rel="noopener noreferrer" class="read-more">元記事を読む →</a>'
+        '</div>'
+    )
+
+def render_card(item):
+    return _card(
+        str(item.get("source") or ""),
+        " ".join(str(item.get("title") or "").split()),
+        str(item.get("url") or ""),
+        date_text(item.get("date")),
+        " ".join(str(item.get("summary") or "").split()),
+    )
+
+def render_cards(items):
+    return '<div class="news-list">' + "".join(render_card(item) for item in items) + "</div>"
+
+def page_count(total, page_size):
+    return max(1, -(-total // page_size))
+
+def page_slice(items, page, page_size):
+    # page is 1-based and clamped to the pages that exist; returns (page, items on it, offset)
+    page = min(max(int(page), 1), page_count(len(items), page_size))
+    offset = (page - 1) * page_size
+    return page, items[offset:offset + page_size], offset
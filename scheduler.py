@@ -0,0 +1,178 @@
+import argparse
+import os
+import threading
+import time
+from datetime import datetime
+
+from collectors import SOURCE_NAMES, iter_collect_news
+from file_lock import FileLock
+import static_export
+import telemetry
+from data_manager import JST, load_news, merge_news, read_json_file, save_history, save_news, write_json_file
+
+# Minutes between scheduled runs per source
+DEFAULT_INTERVAL_MINUTES = 30
+SOURCE_INTERVALS = {
+    "Toyota": 30,
+    "Honda": 30,
+    "Mazda": 60,
+    "Subaru": 60,
+    "Daihatsu": 60,
+    "Suzuki": 60,
+    "Mitsubishi Motors": 60,
+    "Nissan": 30,
+}
+
+STATE_FILE = "scheduler_state.json"
+REFRESH_REQUEST_FILE = "refresh_request.json"
+PROGRESS_FILE = "refresh_progress.json"
+POLL_SECONDS = 5
+# Only one refresh runs at a time across all processes (dashboard instances, daemon, CLI)
+REFRESH_LOCK_FILE = "refresh.lock"
+REFRESH_LOCK_STALE_SECONDS = 600
+HEARTBEAT_TIMEOUT_SECONDS = 120
+
+_local_lock = threading.Lock()
+_local_thread = None
+
+def refresh_lock():
+    return FileLock(REFRESH_LOCK_FILE, REFRESH_LOCK_STALE_SECONDS)
+
+def run_once(sources=None, join=True, deadline=None, on_batch=None, dry_run=False):
+    # Single flight: when another process is already refreshing, this call does not collect
+    # again; with join=True it waits for that run to finish. Returns None in that case.
+    # on_batch(name, items) is called after each source's batch is saved; dry_run collects
+    # without writing anything: stored news, history, progress, static exports, caches,
+    # breaker state and the run log stay as they were.
+    lock = refresh_lock()
+    if not lock.acquire():
+        if join:
+            lock.wait_released()
+        return None
+    try:
+        # Each source's batch is merged and saved as soon as it arrives, so the dashboard
+        # can show the fastest makers' articles while slower ones are still being fetched
+        progress = {"started_at": time.time(), "sources": list(SOURCE_NAMES if sources is None else sources), "done": []}
+        if not dry_run:
+            write_json_file(PROGRESS_FILE, progress)
+        news = [] if dry_run else load_news()
+        new_items = []
+        for name, batch in iter_collect_news(sources, deadline, persist=not dry_run):
+            new_items.extend(batch)
+            if batch and not dry_run:
+                news = merge_news(news, batch)
+                # Static copies (static_export.py) follow every successful save
+                if save_news(news):
+                    static_export.export_snapshot(news)
+            if on_batch is not None:
+                on_batch(name, batch)
+            if not dry_run:
+                progress["done"].append(name)
+                write_json_file(PROGRESS_FILE, progress)
+        # 更新履歴の保存（チェックした時刻として記録）
+        if not dry_run:
+            save_history(datetime.now(JST).strftime("%Y/%m/%d %H:%M:%S"))
+        return new_items
+    finally:
+        lock.release()
+
+def load_progress():
+    progress = read_json_file(PROGRESS_FILE, {})
+    return progress if isinstance(progress, dict) else {}
+
+def load_state():
+    state = read_json_file(STATE_FILE, {})
+    return state if isinstance(state, dict) else {}
+
+def daemon_alive(state=None):
+    state = load_state() if state is None else state
+    return time.time() - state.get("heartbeat", 0) < HEARTBEAT_TIMEOUT_SECONDS
+
+def is_refreshing():
+    if _local_thread is not None and _local_thread.is_alive():
+        return True
+    if refresh_lock().locked():
+        return True
+    state = load_state()
+    if not daemon_alive(state):
+        return False
+    return bool(state.get("running")) or os.path.exists(REFRESH_REQUEST_FILE)
+
+def request_refresh():
+    # Called from the dashboard: never collects in the caller's thread.
+    # With a running daemon the request is queued for it, otherwise a background thread does the run.
+    global _local_thread
+    # A refresh in any process is joined rather than started twice
+    if refresh_lock().locked():
+        return "running"
+    if daemon_alive():
+        write_json_file(REFRESH_REQUEST_FILE, {"requested_at": time.time()})
+        return "queued"
+    with _local_lock:
+        if _local_thread is not None and _local_thread.is_alive():
+            return "running"
+        _local_thread = threading.Thread(target=_run_quietly, name="news-refresh", daemon=True)
+        _local_thread.start()
+        return "started"
+
+def _run_quietly(sources=None):
+    try:
+        run_once(sources)
+    except Exception as e:
+        print(f"Error collecting news: {e}")
+
+def due_sources(state, now):
+    last_runs = state.get("last_run", {})
+    due = []
+    for name in SOURCE_NAMES:
+        interval = SOURCE_INTERVALS.get(name, DEFAULT_INTERVAL_MINUTES) * 60
+        if now - last_runs.get(name, 0) >= interval:
+            due.append(name)
+    return due
+
+def _take_refresh_request():
+    if not os.path.exists(REFRESH_REQUEST_FILE):
+        return False
+    try:
+        os.remove(REFRESH_REQUEST_FILE)
+    except OSError:
+        pass
+    return True
+
+def run_forever():
+    state = load_state()
+    while True:
+        now = time.time()
+        state["heartbeat"] = now
+        sources = list(SOURCE_NAMES) if _take_refresh_request() else due_sources(state, now)
+        if sources:
+            state["running"] = True
+            write_json_file(STATE_FILE, state)
+            _run_quietly(sources)
+            finished = time.time()
+            for name in sources:
+                state.setdefault("last_run", {})[name] = finished
+            state["running"] = False
+            state["heartbeat"] = finished
+        write_json_file(STATE_FILE, state)
+        time.sleep(POLL_SECONDS)
+
+def main():
+    parser = argparse.ArgumentParser(description="BestCar Auto News background collector")
+    parser.add_argument("--once", action="store_true", help="collect once and exit")
+    parser.add_argument("--sources", nargs="*", choices=SOURCE_NAMES, help="limit --once to these sources")
+    parser.add_argument("--metrics-port", type=int, help="serve the Prometheus metrics file at /metrics on this port")
+    args = parser.parse_args()
+    if args.metrics_port:
+        telemetry.serve_metrics(args.metrics_port)
+    if args.once:
+        items = run_once(args.sources)
+        if items is None:
+            print("Joined a refresh that was already running.")
+        else:
+            print(f"Collected {len(items)} items.")
+        return
+    run_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import threading
+import unicodedata
+from datetime import datetime
+
+TITLE_WEIGHT = 3
+
+def normalize(text):
+    # NFKC folds full-width latin/digits and half-width kana so "ＥＶ" matches "ev"
+    return unicodedata.normalize("NFKC", str(text or "")).lower()
+
+def ngrams(text):
+    # Character bigrams work for Japanese without a morphological analyzer
+    text = "".join(text.split())
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+def _timestamp(item):
+    dt = item.get("date")
+    return dt.timestamp() if isinstance(dt, datetime) else 0
+
+class SearchIndex:
+    def __init__(self, items=None):
+        self.lock = threading.RLock()
+        self.docs = {}
+        self.postings = {}
+        if items:
+            self.add(items)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _signature(self, item):
+        return (item.get("title"), item.get("summary"), item.get("source"), item.get("date"))
+
+    def add(self, items):
+        with self.lock:
+            for item in items:
+                url = item.get("url")
+                if not url:
+                    continue
+                doc = self.docs.get(url)
+                if doc is not None:
+                    if doc["signature"] == self._signature(item):
+                        doc["item"] = item
+                        continue
+                    self.remove([url])
+                title, summary = normalize(item.get("title")), normalize(item.get("summary"))
+                grams = ngrams(title) | ngrams(summary)
+                self.docs[url] = {"item": item, "title": title, "summary": summary, "grams": grams, "signature": self._signature(item)}
+                for gram in grams:
+                    self.postings.setdefault(gram, set()).add(url)
+
+    def remove(self, urls):
+        with self.lock:
+            for url in urls:
+                doc = self.docs.pop(url, None)
+                if doc is None:
+                    continue
+                for gram in doc["grams"]:
+                    posting = self.postings.get(gram)
+                    if posting is not None:
+                        posting.discard(url)
+                        if not posting:
+                            del self.postings[gram]
+
+    def sync(self, items):
+        # Brings the index in line with the current store, re-tokenizing only new or edited items
+        with self.lock:
+            current = {item.get("url") for item in items if item.get("url")}
+            self.remove([url for url in self.docs if url not in current])
+            self.add(items)
+
+    def _candidates(self, terms):
+        grams = set()
+        for term in terms:
+            # One-character terms have no bigram to look up; search() checks them against the text
+            if len(term) > 1:
+                grams |= ngrams(term)
+        candidates = None
+        for gram in sorted(grams, key=lambda g: len(self.postings.get(g, ()))):
+            posting = self.postings.get(gram)
+            if not posting:
+                return set()
+            candidates = set(posting) if candidates is None else candidates & posting
+            if not candidates:
+                return set()
+        return candidates if candidates is not None else set(self.docs)
+
+    def search(self, query="", sources=None, since=None, until=None, limit=None):
+        # Every whitespace-separated term must match the title or summary; title hits rank higher, then newer first
+        terms = [t for t in normalize(query).split() if t]
+        sources = set(sources) if sources is not None else None
+        since_ts = since.timestamp() if since else None
+        until_ts = until.timestamp() if until else None
+        results = []
+        with self.lock:
+            for url in self._candidates(terms):
+                doc = self.docs[url]
+                item = doc["item"]
+                if sources is not None and item.get("source") not in sources:
+                    continue
+                ts = _timestamp(item)
+                if since_ts is not None and ts < since_ts:
+                    continue
+                if until_ts is not None and ts > until_ts:
+                    continue
+                score = 0
+                for term in terms:
+                    hits = doc["title"].count(term) * TITLE_WEIGHT + doc["summary"].count(term)
+                    if not hits:
+                        break
+                    score += hits
+                else:
+                    results.append((score, ts, item))
+        results.sort(key=lambda r: (r[0], r[1]), reverse=True)
+        items = [item for _, _, item in results]
+        return items[:limit] if limit else items
@@ -0,0 +1,135 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+DB_FILE = "news.db"
+
+NEWS_COLUMNS = ("url", "source", "title", "date", "summary")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    source TEXT,
+    title TEXT,
+    date TEXT,
+    ts REAL NOT NULL DEFAULT 0,
+    summary TEXT,
+    extra TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS news_url ON news (url);
+CREATE INDEX IF NOT EXISTS news_ts ON news (ts DESC);
+CREATE INDEX IF NOT EXISTS news_source_ts ON news (source, ts DESC);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fetched_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+UPSERT = """
+INSERT INTO news (url, source, title, date, ts, summary, extra)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    source = excluded.source,
+    title = excluded.title,
+    date = excluded.date,
+    ts = excluded.ts,
+    summary = excluded.summary,
+    extra = excluded.extra
+WHERE news.source IS NOT excluded.source
+    OR news.title IS NOT excluded.title
+    OR news.date IS NOT excluded.date
+    OR news.summary IS NOT excluded.summary
+    OR news.extra IS NOT excluded.extra
+"""
+
+_initialized = set()
+
+def connect(path=None):
+    path = os.path.abspath(path or DB_FILE)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if path not in _initialized:
+        # WAL lets the dashboard read while a refresh is writing
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _initialized.add(path)
+    return conn
+
+def _row_values(item):
+    dt = item.get("date")
+    if isinstance(dt, datetime):
+        date_text, ts = dt.isoformat(), dt.timestamp()
+    else:
+        date_text, ts = (str(dt) if dt else None), 0
+    extra = {k: v for k, v in item.items() if k not in NEWS_COLUMNS}
+    extra_text = json.dumps(extra, ensure_ascii=False, sort_keys=True, default=str) if extra else None
+    return (item.get("url"), item.get("source"), item.get("title"), date_text, ts, item.get("summary"), extra_text)
+
+def _row_item(row):
+    item = {"source": row["source"], "title": row["title"], "url": row["url"], "date": row["date"], "summary": row["summary"] or ""}
+    if row["extra"]:
+        try:
+            item.update(json.loads(row["extra"]))
+        except ValueError:
+            pass
+    return item
+
+def load_news(limit=None, source=None):
+    query = "SELECT * FROM news"
+    params = []
+    if source:
+        query += " WHERE source = ?"
+        params.append(source)
+    query += " ORDER BY ts DESC, id DESC"
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    with closing(connect()) as conn:
+        return [_row_item(row) for row in conn.execute(query, params)]
+
+def upsert_news(news_list):
+    # Unchanged rows are skipped by the WHERE clause of the upsert, so only new or edited items are written
+    rows = [_row_values(item) for item in news_list if item.get("url")]
+    with closing(connect()) as conn:
+        with conn:
+            before = conn.total_changes
+            conn.executemany(UPSERT, rows)
+            return conn.total_changes - before
+
+def prune_news(before_ts):
+    with closing(connect()) as conn:
+        with conn:
+            return conn.execute("DELETE FROM news WHERE ts > 0 AND ts < ?", (before_ts,)).rowcount
+
+def load_history(limit):
+    with closing(connect()) as conn:
+        return [row["fetched_at"] for row in conn.execute("SELECT fetched_at FROM history ORDER BY id DESC LIMIT ?", (limit,))]
+
+def add_history(timestamp_str, keep):
+    with closing(connect()) as conn:
+        with conn:
+            conn.execute("INSERT INTO history (fetched_at) VALUES (?)", (timestamp_str,))
+            conn.execute("DELETE FROM history WHERE id NOT IN (SELECT id FROM history ORDER BY id DESC LIMIT ?)", (keep,))
+
+def is_migrated():
+    with closing(connect()) as conn:
+        return conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone() is not None
+
+def migrate(news_list, history):
+    # One-shot import of the JSON store; history is newest-first as in fetch_history.json
+    with closing(connect()) as conn:
+        with conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+                return False
+            conn.executemany(UPSERT, [_row_values(item) for item in news_list if item.get("url")])
+            conn.executemany("INSERT INTO history (fetched_at) VALUES (?)", [(ts,) for ts in reversed(history)])
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', ?)", (datetime.now().isoformat(),))
+            return True
@@ -0,0 +1,112 @@
+import html
+import os
+from datetime import datetime
+from email.utils import format_datetime
+
+import rendering
+from data_manager import JST, write_json_file, write_text_file
+
+# Read-only copies of the latest news for any static file server or CDN: a page of cards,
+# a JSON file and RSS 2.0 / Atom feeds of all makers. Rewritten after every save; each file
+# is replaced atomically, so a server never hands out a half-written one.
+# An empty NEWS_EXPORT_DIR turns the export off
+EXPORT_DIR = os.environ.get("NEWS_EXPORT_DIR", "public")
+EXPORT_ITEMS = 100
+# Absolute URL the directory is served from; used for feed links (relative links without it)
+SITE_URL = os.environ.get("NEWS_SITE_URL", "")
+SITE_TITLE = "BestCar Auto News"
+SITE_DESCRIPTION = "国内自動車メーカー各社の最新ニュース"
+
+PAGE_CSS = """
+body { font-family: sans-serif; background: #fafafa; color: #333; max-width: 960px; margin: 0 auto; padding: 20px; }
+.generated { font-size: 0.8rem; color: #999; }
+"""
+
+def _aware(dt):
+    return dt if dt.tzinfo else dt.replace(tzinfo=JST)
+
+def _site_link(name):
+    return SITE_URL.rstrip("/") + "/" + name if SITE_URL else name
+
+def _latest(news_list):
+    items = [item for item in news_list if item.get("url")]
+    items.sort(key=lambda x: x.get("date").timestamp() if isinstance(x.get("date"), datetime) else 0, reverse=True)
+    return items[:EXPORT_ITEMS]
+
+def render_html(items, generated):
+    return (
+        '<!DOCTYPE html>\n<html lang="ja">\n<head>\n<meta charset="utf-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+        f"<title>{html.escape(SITE_TITLE)}</title>\n"
+        '<link rel="alternate" type="application/rss+xml" title="RSS" href="rss.xml">\n'
+        '<link rel="alternate" type="application/atom+xml" title="Atom" href="atom.xml">\n'
+        f"<style>{PAGE_CSS}{rendering.CARD_CSS}</style>\n</head>\n<body>\n"
+        f"<h1>🚗 {html.escape(SITE_TITLE)}</h1>\n"
+        f'<p class="generated">更新: {generated.strftime("%Y/%m/%d %H:%M")}</p>\n'
+        f"{rendering.render_cards(items)}\n"
+        "<footer>© 2026 BestCar Auto News Project</footer>\n</body>\n</html>\n"
+    )
+
+def render_rss(items, generated):
+    entries = []
+    for item in items:
+        url = html.escape(rendering.safe_url(item.get("url")))
+        date = f"<pubDate>{format_datetime(_aware(item['date']))}</pubDate>" if isinstance(item.get("date"), datetime) else ""
+        entries.append(
+            f"<item><title>{html.escape(str(item.get('title') or ''))}</title><link>{url}</link>"
+            f'<guid isPermaLink="true">{url}</guid>{date}'
+            f"<category>{html.escape(str(item.get('source') or ''))}</category>"
+            f"<description>{html.escape(str(item.get('summary') or ''))}</description></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n<rss version="2.0"><channel>'
+        f"<title>{html.escape(SITE_TITLE)}</title><link>{html.escape(_site_link('index.html'))}</link>"
+        f"<description>{html.escape(SITE_DESCRIPTION)}</description><language>ja</language>"
+        f"<lastBuildDate>{format_datetime(generated)}</lastBuildDate>"
+        + "".join(entries) + "</channel></rss>\n"
+    )
+
+def render_atom(items, generated):
+    entries = []
+    for item in items:
+        url = html.escape(rendering.safe_url(item.get("url")))
+        updated = _aware(item["date"]).isoformat() if isinstance(item.get("date"), datetime) else generated.isoformat()
+        entries.append(
+            f"<entry><title>{html.escape(str(item.get('title') or ''))}</title><link href=\"{url}\"/>"
+            f"<id>{url}</id><updated>{updated}</updated>"
+            f"<author><name>{html.escape(str(item.get('source') or ''))}</name></author>"
+            f"<summary>{html.escape(str(item.get('summary') or ''))}</summary></entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>{html.escape(SITE_TITLE)}</title><subtitle>{html.escape(SITE_DESCRIPTION)}</subtitle>"
+        f"<link href=\"{html.escape(_site_link('index.html'))}\"/>"
+        f"<link rel=\"self\" href=\"{html.escape(_site_link('atom.xml'))}\"/>"
+        f"<id>{html.escape(SITE_URL or 'urn:bestcar-auto-news')}</id><updated>{generated.isoformat()}</updated>"
+        + "".join(entries) + "</feed>\n"
+    )
+
+def export_snapshot(news_list, directory=None):
+    # Returns True when every file was written
+    directory = EXPORT_DIR if directory is None else directory
+    if not directory:
+        return False
+    try:
+        os.makedirs(directory, exist_ok=True)
+        items = _latest(news_list)
+        generated = datetime.now(JST)
+        data = {
+            "generated_at": generated,
+            "count": len(items),
+            "items": [{key: item.get(key) for key in ("source", "title", "url", "date", "summary")} for item in items],
+        }
+        results = [
+            write_json_file(os.path.join(directory, "news.json"), data),
+            write_text_file(os.path.join(directory, "rss.xml"), render_rss(items, generated)),
+            write_text_file(os.path.join(directory, "atom.xml"), render_atom(items, generated)),
+            write_text_file(os.path.join(directory, "index.html"), render_html(items, generated)),
+        ]
+        return all(results)
+    except Exception as e:
+        print(f"Error exporting snapshot: {e}")
+        return False
@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+
+from data_manager import JsonStateFile
+
+# Article summaries keyed by URL, so detail pages are fetched once per article
+SUMMARY_CACHE_FILE = "summary_cache.json"
+SUMMARY_TTL_DAYS = 30
+MAX_SUMMARIES = 2000
+
+def _ordered(data):
+    # Oldest first, so eviction drops the least recently saved
+    entries = OrderedDict()
+    for url, value in sorted(data.items(), key=lambda kv: kv[1][1] if isinstance(kv[1], list) else 0):
+        if isinstance(value, list) and len(value) == 2:
+            entries[url] = value
+    return entries
+
+_state = JsonStateFile(SUMMARY_CACHE_FILE, _ordered)
+
+def _expired(saved_at, now):
+    return now - saved_at > SUMMARY_TTL_DAYS * 86400
+
+def _evict(entries):
+    while len(entries) > MAX_SUMMARIES:
+        entries.popitem(last=False)
+
+def get(url):
+    if not url: return None
+    with _state.lock:
+        entries = _state.entries()
+        value = entries.get(url)
+        if value is None: return None
+        if _expired(value[1], time.time()):
+            del entries[url]
+            return None
+        entries.move_to_end(url)
+        return value[0]
+
+def put(url, summary):
+    if not url or not summary: return
+    with _state.lock:
+        entries = _state.entries()
+        entries[url] = [summary, time.time()]
+        entries.move_to_end(url)
+        _evict(entries)
+        _state.dirty = True
+
+def seed(news_items, min_length=0):
+    # Summaries already stored in news_data.json never need another detail fetch
+    now = time.time()
+    with _state.lock:
+        entries = _state.entries()
+        for item in news_items:
+            url, summary = item.get("url"), item.get("summary")
+            if url and summary and len(summary) >= min_length and url not in entries:
+                entries[url] = [summary, now]
+                entries.move_to_end(url, last=False)
+                _state.dirty = True
+        _evict(entries)
+
+def reset():
+    _state.reset()
+
+def flush():
+    _state.flush()
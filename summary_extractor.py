@@ -0,0 +1,175 @@
+import codecs
+import re
+from html.parser import HTMLParser
+
+SKIP_TAGS = {"script", "style", "noscript", "header", "footer", "nav"}
+MIN_PARAGRAPH_LENGTH = 20
+ENOUGH_TEXT_LENGTH = 300
+MIN_DESCRIPTION_LENGTH = 40
+MAX_SUMMARY_BYTES = 1024 * 1024
+SNIFF_BYTES = 4096
+
+CHARSET_ALIASES = {"shift_jis": "cp932", "shift-jis": "cp932", "sjis": "cp932", "x-sjis": "cp932", "windows-31j": "cp932"}
+
+_header_charset_re = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_meta_charset_re = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+
+def _normalize_charset(name):
+    if not name:
+        return None
+    name = name.strip().lower()
+    name = CHARSET_ALIASES.get(name, name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+def detect_charset(content_type, head):
+    # Declared charset first (HTTP header, then <meta>), detection only as a last resort
+    m = _header_charset_re.search(content_type or "")
+    charset = _normalize_charset(m.group(1)) if m else None
+    if charset:
+        return charset
+    m = _meta_charset_re.search(head[:SNIFF_BYTES])
+    charset = _normalize_charset(m.group(1).decode("ascii", "ignore")) if m else None
+    if charset:
+        return charset
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(head).best()
+        charset = _normalize_charset(best.encoding) if best else None
+    except ImportError:
+        try:
+            import chardet
+            charset = _normalize_charset(chardet.detect(head).get("encoding"))
+        except ImportError:
+            charset = None
+    return charset or "utf-8"
+
+class SummaryExtractor(HTMLParser):
+    # Incremental counterpart of the BeautifulSoup <p> scan: text inside the first <main>, else
+    # the first <article>, else the whole page, with head meta descriptions preferred when present.
+    # A later <main> outranks everything before it, so only <main> text ends the scan early.
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.description = ""
+        self.paragraphs = {"main": [], "article": [], "all": []}
+        self.lengths = {"main": 0, "article": 0, "all": 0}
+        self.seen = set()
+        self.open_containers = {"main": 0, "article": 0}
+        self.skip_depth = 0
+        self.in_head = True
+        self.paragraph = None
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if tag == "meta" and self.in_head:
+            attrs = dict(attrs)
+            key = (attrs.get("property") or attrs.get("name") or "").lower()
+            if key in ("og:description", "description") and not self.description:
+                content = " ".join((attrs.get("content") or "").split())
+                if len(content) >= MIN_DESCRIPTION_LENGTH:
+                    self.description = content
+        elif tag == "body":
+            self._end_head()
+        elif tag in self.open_containers and not self.skip_depth and (tag not in self.seen or self.open_containers[tag]):
+            self.open_containers[tag] += 1
+            self.seen.add(tag)
+        elif tag == "p" and not self.skip_depth:
+            self._end_paragraph()
+            self.paragraph = []
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == "head":
+            self._end_head()
+        elif tag in self.open_containers and self.open_containers[tag]:
+            self._end_paragraph()
+            self.open_containers[tag] -= 1
+            # The first <main> is closed: its text is final
+            if tag == "main" and not self.open_containers[tag]:
+                self.done = True
+        elif tag == "p":
+            self._end_paragraph()
+
+    def handle_data(self, data):
+        if self.paragraph is not None and not self.skip_depth:
+            self.paragraph.append(data.strip())
+
+    def _end_head(self):
+        self.in_head = False
+        if self.description:
+            self.done = True
+
+    def _end_paragraph(self):
+        if self.paragraph is None:
+            return
+        text = "".join(self.paragraph)
+        self.paragraph = None
+        if len(text) <= MIN_PARAGRAPH_LENGTH:
+            return
+        scopes = ["all"] + [name for name, depth in self.open_containers.items() if depth]
+        for scope in scopes:
+            if self.lengths[scope] <= ENOUGH_TEXT_LENGTH:
+                self.paragraphs[scope].append(text)
+                self.lengths[scope] += len(text)
+        if self.open_containers["main"] and self.lengths["main"] > ENOUGH_TEXT_LENGTH:
+            self.done = True
+
+    def _scope(self):
+        if "main" in self.seen: return "main"
+        if "article" in self.seen: return "article"
+        return "all"
+
+    def summary(self):
+        if self.description:
+            return self.description
+        self._end_paragraph()
+        return " ".join(self.paragraphs[self._scope()])
+
+class StreamExtractor:
+    # Incremental form of extract_stream for callers that receive chunks themselves (async fetches)
+    def __init__(self, content_type=None, max_bytes=MAX_SUMMARY_BYTES):
+        self.content_type = content_type
+        self.max_bytes = max_bytes
+        self.extractor = SummaryExtractor()
+        self.decoder = None
+        self.head = b""
+        self.total = 0
+
+    def feed(self, chunk):
+        # Returns True once no more chunks are needed
+        if not chunk:
+            return False
+        self.total += len(chunk)
+        if self.decoder is None:
+            self.head += chunk
+            if len(self.head) < SNIFF_BYTES and self.total < self.max_bytes:
+                return False
+            self.decoder = codecs.getincrementaldecoder(detect_charset(self.content_type, self.head))(errors="replace")
+            chunk, self.head = self.head, b""
+        self.extractor.feed(self.decoder.decode(chunk))
+        return self.extractor.done or self.total >= self.max_bytes
+
+    def close(self):
+        if self.decoder is None and self.head:
+            self.decoder = codecs.getincrementaldecoder(detect_charset(self.content_type, self.head))(errors="replace")
+            self.extractor.feed(self.decoder.decode(self.head))
+        if self.decoder is not None and not self.extractor.done:
+            self.extractor.feed(self.decoder.decode(b"", final=True))
+        return self.extractor.summary()
+
+def extract_stream(chunks, content_type=None, max_bytes=MAX_SUMMARY_BYTES):
+    # Feeds chunks until enough text is found; remaining chunks are never read
+    stream = StreamExtractor(content_type, max_bytes)
+    for chunk in chunks:
+        if stream.feed(chunk):
+            break
+    return stream.close()
+
+def extract_summary(content, content_type=None):
+    return extract_stream([content], content_type)
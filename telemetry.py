@@ -0,0 +1,280 @@
+import contextvars
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from data_manager import JST, file_version, read_json_file, write_json_file, write_text_file
+
+# Structured per-run records next to fetch_history.json, plus a Prometheus text file
+RUNS_FILE = "fetch_runs.json"
+METRICS_FILE = "metrics.prom"
+MAX_RUNS = 50
+
+# The source being collected; a context variable so it follows threads (via bind) and asyncio tasks
+_source = contextvars.ContextVar("telemetry_source", default=None)
+
+def error_class(exc):
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return f"{type(exc).__name__} {status}" if status else type(exc).__name__
+
+class SourceStats:
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.started = None
+        self.duration = None
+        self.requests = 0
+        self.request_seconds = 0.0
+        self.bytes = 0
+        self.statuses = Counter()
+        self.hosts = Counter()
+        self.errors = Counter()
+        # Seconds per phase: "network" (listing requests), "parse", "dates" (part of parse),
+        # "detail" (waiting for article pages)
+        self.phases = Counter()
+        self.items_found = 0
+        self.items_kept = 0
+        self.items_duplicate = 0
+        self.detail_fetches = 0
+        self.deadline = None
+        self.incomplete = False
+        self.skipped = False
+
+    def record_request(self, url, status, seconds, nbytes, error=None):
+        with self.lock:
+            self.requests += 1
+            self.request_seconds += seconds
+            self.bytes += nbytes
+            self.statuses[str(status) if status else "error"] += 1
+            self.hosts[urlparse(url).netloc] += 1
+            if error is not None:
+                self.errors[error_class(error)] += 1
+
+    def record_error(self, exc):
+        with self.lock:
+            self.errors[error_class(exc)] += 1
+
+    def add(self, field, amount=1):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def add_phase(self, name, seconds):
+        with self.lock:
+            self.phases[name] += seconds
+
+    def status(self):
+        if self.skipped: return "skipped"
+        if self.incomplete: return "incomplete"
+        if self.items_kept: return "ok"
+        if self.errors: return "error"
+        return "empty"
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "status": self.status(),
+                "duration_ms": round(self.duration * 1000, 1) if self.duration is not None else None,
+                "requests": self.requests,
+                "request_ms": round(self.request_seconds * 1000, 1),
+                "bytes": self.bytes,
+                "statuses": dict(self.statuses),
+                "hosts": dict(self.hosts),
+                "errors": dict(self.errors),
+                "phase_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+                "items_found": self.items_found,
+                "items_kept": self.items_kept,
+                "items_duplicate": self.items_duplicate,
+                "detail_fetches": self.detail_fetches,
+                "incomplete": self.incomplete,
+                "skipped": self.skipped,
+            }
+
+class RunStats:
+    def __init__(self, sources):
+        self.started = time.time()
+        self.finished = None
+        self.sources = {name: SourceStats(name) for name in sources}
+
+    def finish(self):
+        self.finished = time.time()
+
+    def to_dict(self):
+        return {
+            "started_at": datetime.fromtimestamp(self.started, JST).isoformat(),
+            "duration_ms": round(((self.finished or time.time()) - self.started) * 1000, 1),
+            "sources": {name: stats.to_dict() for name, stats in self.sources.items()},
+        }
+
+def current():
+    return _source.get()
+
+@contextmanager
+def source_scope(stats):
+    token = _source.set(stats)
+    try:
+        yield stats
+    finally:
+        _source.reset(token)
+
+def bind(fn):
+    # Carries the caller's source into pool threads
+    stats = current()
+    def wrapper(*args, **kwargs):
+        with source_scope(stats):
+            return fn(*args, **kwargs)
+    return wrapper
+
+def record_request(url, status, seconds, nbytes, error=None):
+    stats = current()
+    if stats is not None:
+        stats.record_request(url, status, seconds, nbytes, error)
+
+def record_error(exc):
+    stats = current()
+    if stats is not None:
+        stats.record_error(exc)
+
+def count(field, amount=1):
+    stats = current()
+    if stats is not None:
+        stats.add(field, amount)
+
+def add_phase(name, seconds):
+    stats = current()
+    if stats is not None:
+        stats.add_phase(name, seconds)
+
+@contextmanager
+def phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase(name, time.perf_counter() - start)
+
+def remaining():
+    # Seconds left in the current source's budget, or None when it has no deadline
+    stats = current()
+    if stats is None or stats.deadline is None:
+        return None
+    return stats.deadline - time.monotonic()
+
+def expired():
+    left = remaining()
+    return left is not None and left <= 0
+
+def mark_incomplete():
+    stats = current()
+    if stats is not None:
+        stats.incomplete = True
+
+def load_runs():
+    runs = read_json_file(RUNS_FILE, [])
+    return runs if isinstance(runs, list) else []
+
+_latest_lock = threading.Lock()
+_latest = (None, None)
+
+def latest_run():
+    global _latest
+    version = file_version(RUNS_FILE)
+    with _latest_lock:
+        if _latest[0] != version:
+            runs = load_runs()
+            _latest = (version, runs[0] if runs else None)
+        return _latest[1]
+
+# The newest run finished in this process, also when it was not saved (dry runs)
+_finished = None
+
+def finished_run():
+    return _finished
+
+def save_run(run, persist=True):
+    global _finished
+    record = run.to_dict()
+    _finished = record
+    if not persist:
+        return record
+    runs = load_runs()
+    runs.insert(0, record)
+    write_json_file(RUNS_FILE, runs[:MAX_RUNS], indent=2)
+    write_metrics(record)
+    return record
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def render_metrics(record):
+    lines = [
+        "# HELP bestcar_run_duration_seconds Wall time of the last collection run.",
+        "# TYPE bestcar_run_duration_seconds gauge",
+        f"bestcar_run_duration_seconds {record['duration_ms'] / 1000:.3f}",
+        "# HELP bestcar_run_timestamp_seconds Start time of the last collection run.",
+        "# TYPE bestcar_run_timestamp_seconds gauge",
+        f"bestcar_run_timestamp_seconds {datetime.fromisoformat(record['started_at']).timestamp():.0f}",
+    ]
+    gauges = [
+        ("source_duration_seconds", "Wall time per source.", lambda s: (s["duration_ms"] or 0) / 1000),
+        ("source_up", "1 when the source returned items.", lambda s: 1 if s["status"] == "ok" else 0),
+        ("source_incomplete", "1 when the source ran out of time.", lambda s: 1 if s.get("incomplete") else 0),
+        ("source_skipped", "1 when the source's circuit breaker was open.", lambda s: 1 if s.get("skipped") else 0),
+        ("source_requests", "HTTP requests per source.", lambda s: s["requests"]),
+        ("source_bytes", "Response bytes per source.", lambda s: s["bytes"]),
+        ("source_items_found", "Entries found in feeds/listings.", lambda s: s["items_found"]),
+        ("source_items_kept", "Items returned by the source.", lambda s: s["items_kept"]),
+        ("source_items_duplicate", "Entries dropped as duplicates of stored or already collected items.", lambda s: s.get("items_duplicate", 0)),
+        ("source_detail_fetches", "Article pages fetched.", lambda s: s["detail_fetches"]),
+    ]
+    sources = record["sources"]
+    for name, help_text, value in gauges:
+        lines += [f"# HELP bestcar_{name} {help_text}", f"# TYPE bestcar_{name} gauge"]
+        for source, stats in sources.items():
+            lines.append(f'bestcar_{name}{{source="{_label(source)}"}} {value(stats):g}')
+    lines += ["# HELP bestcar_source_http_responses HTTP responses per source and status.", "# TYPE bestcar_source_http_responses gauge"]
+    for source, stats in sources.items():
+        for status, n in sorted(stats["statuses"].items()):
+            lines.append(f'bestcar_source_http_responses{{source="{_label(source)}",status="{_label(status)}"}} {n}')
+    lines += ["# HELP bestcar_source_phase_seconds Time per source spent in listing requests, parsing, date handling and article pages.", "# TYPE bestcar_source_phase_seconds gauge"]
+    for source, stats in sources.items():
+        for phase_name, ms in sorted(stats.get("phase_ms", {}).items()):
+            lines.append(f'bestcar_source_phase_seconds{{source="{_label(source)}",phase="{_label(phase_name)}"}} {ms / 1000:.3f}')
+    lines += ["# HELP bestcar_source_errors Errors per source and error class.", "# TYPE bestcar_source_errors gauge"]
+    for source, stats in sources.items():
+        for error, n in sorted(stats["errors"].items()):
+            lines.append(f'bestcar_source_errors{{source="{_label(source)}",error="{_label(error)}"}} {n}')
+    return "\n".join(lines) + "\n"
+
+def write_metrics(record):
+    write_text_file(METRICS_FILE, render_metrics(record))
+
+def serve_metrics(port, host="0.0.0.0"):
+    # Minimal /metrics endpoint for Prometheus scraping; serves the file written after each run
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            try:
+                with open(METRICS_FILE, "rb") as f:
+                    body = f.read()
+            except OSError:
+                body = b""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server